@@ -1,4 +1,310 @@
 import random
+import numpy as np
+from collections.abc import MutableMapping
+
+class CivilizationTable:
+    """
+    Struct-of-arrays storage for civilization state.
+    Each row holds one civilization's numeric state; Civilization objects are
+    thin views onto a row. Columns double in capacity as rows are appended.
+    Attributes:
+        size: Number of rows in use
+        ids: Civilization id per row
+        population, growth_rate, resources, tech_level: Numeric state columns
+        status: Index into STATUSES
+        home_star: Star id of the home planet
+        traits: (rows, len(TRAITS)) trait matrix
+        alive_count, alive_population, alive_tech: Running totals over living
+            rows, kept current by set_status/set_population/set_tech_level/grow
+    """
+    TRAITS = ('aggression', 'curiosity', 'risk_tolerance')
+    STATUSES = ('alive', 'collapsed')
+    COLUMNS = {
+        'ids': np.int64,
+        'population': np.int64,
+        'growth_rate': np.float64,
+        'resources': np.int64,
+        'tech_level': np.int64,
+        'status': np.int8,
+        'home_star': np.int64,
+    }
+
+    def __init__(self, capacity=16):
+        self.size = 0
+        for name, dtype in self.COLUMNS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.traits = np.zeros((capacity, len(self.TRAITS)))
+        self.alive_count = 0
+        self.alive_population = 0
+        self.alive_tech = 0
+
+    def _reserve(self, capacity):
+        if capacity <= len(self.ids):
+            return
+        capacity = max(capacity, 2 * len(self.ids))
+        for name in list(self.COLUMNS) + ['traits']:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def append(self, id, population, growth_rate, resources, tech_level=1, status=0, traits=None, home_star=-1):
+        """Add a row and return its index. Traits default to a neutral 0.5 each."""
+        self._reserve(self.size + 1)
+        row = self.size
+        self.ids[row] = id
+        self.population[row] = population
+        self.growth_rate[row] = growth_rate
+        self.resources[row] = resources
+        self.tech_level[row] = tech_level
+        self.status[row] = status
+        self.traits[row] = [0.5] * len(self.TRAITS) if traits is None else traits
+        self.home_star[row] = home_star
+        self.size += 1
+        if status == 0:
+            self.alive_count += 1
+            self.alive_population += int(population)
+            self.alive_tech += int(tech_level)
+        return row
+
+    def copy_row(self, other, row):
+        """Append a copy of row from another table and return the new index."""
+        return self.append(other.ids[row], other.population[row], other.growth_rate[row],
+                           other.resources[row], other.tech_level[row], other.status[row],
+                           other.traits[row], other.home_star[row])
+
+    def set_status(self, row, status):
+        was_alive = self.status[row] == 0
+        self.status[row] = status
+        if was_alive != (status == 0):
+            sign = 1 if status == 0 else -1
+            self.alive_count += sign
+            self.alive_population += sign * int(self.population[row])
+            self.alive_tech += sign * int(self.tech_level[row])
+
+    def set_population(self, row, value):
+        if self.status[row] == 0:
+            self.alive_population += int(value) - int(self.population[row])
+        self.population[row] = value
+
+    def set_tech_level(self, row, value):
+        if self.status[row] == 0:
+            self.alive_tech += int(value) - int(self.tech_level[row])
+        self.tech_level[row] = value
+
+    def alive_rows(self):
+        return np.flatnonzero(self.status[:self.size] == 0)
+
+    def grow(self, rows):
+        """
+        Vectorized Civilization.grow for the given (living) rows.
+        Returns the rows whose resources ran out; the caller collapses them.
+        """
+        population = (self.population[rows] * (1 + self.growth_rate[rows])).astype(np.int64)
+        self.alive_population += int(population.sum()) - int(self.population[rows].sum())
+        self.population[rows] = population
+        self.resources[rows] -= (population * 0.001).astype(np.int64)
+        return rows[self.resources[rows] < 0]
+
+class Traits(MutableMapping):
+    """Dict-like view of a civilization's row in its table's trait matrix."""
+    def __init__(self, civ):
+        self.civ = civ
+
+    @staticmethod
+    def _column(trait):
+        try:
+            return CivilizationTable.TRAITS.index(trait)
+        except ValueError:
+            raise KeyError(trait) from None
+
+    def __getitem__(self, trait):
+        return float(self.civ.table.traits[self.civ.row, self._column(trait)])
+
+    def __setitem__(self, trait, value):
+        self.civ.table.traits[self.civ.row, self._column(trait)] = value
+
+    def __delitem__(self, trait):
+        raise TypeError('civilization traits cannot be removed')
+
+    def __iter__(self):
+        return iter(CivilizationTable.TRAITS)
+
+    def __len__(self):
+        return len(CivilizationTable.TRAITS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+class HistoryJournal:
+    """
+    Array-backed history journal shared by many civilizations.
+    Each entry is an event code, up to four small integer arguments and one
+    float. String arguments (reasons, government or technology names) are
+    interned once and stored as indices. A civilization's entries are linked
+    newest to oldest through `prev`, and text is only produced when an entry
+    is read. Optional retention limits cap how many entries each
+    civilization keeps; dropped entries are reclaimed by compaction.
+    """
+    TEMPLATES = {
+        'text': '{sa}',
+        'collapsed': 'Collapsed due to {sa}',
+        'colonized': 'Colonized planet {a}',
+        'reformed': 'Reformed government to {sa}',
+        'trait_changed': 'Cultural trait {sa} changed by {x}',
+        'revolution': 'Revolution! Gov: {sa}->{sb}, Econ: {sc}->{sd}',
+        'declared_war': 'Declared war on Civ {a}',
+        'attacked_by': 'Was attacked by Civ {a}',
+        'defeated': 'Defeated Civ {a} in war',
+        'trade_started': 'Started trade with Civ {a}',
+        'researched': 'Researched {sa}',
+        'golden_age': 'Golden Age! Growth rate increased.',
+        'plague': 'Plague! Population reduced.',
+        'resource_boom': 'Resource boom! Resources increased.',
+        'resource_crash': 'Resource crash! Resources halved.',
+    }
+    EVENTS = list(TEMPLATES)
+    FORMATS = list(TEMPLATES.values())
+    CODES = {name: code for code, name in enumerate(EVENTS)}
+    COLUMNS = {
+        'code': np.uint8,
+        'civ': np.int32,
+        'prev': np.int32,
+        'args': (np.int32, 4),
+        'x': np.float64,
+    }
+
+    def __init__(self, retention=None, capacity=16):
+        self.retention = retention  # default per-civ entry limit, None = unbounded
+        self.limits = {}  # civ id -> per-civ override
+        self.strings = []
+        self.string_ids = {}
+        self.heads = {}  # civ id -> index of newest entry
+        self.counts = {}  # civ id -> retained entries
+        self.live = 0  # sum of counts
+        self.size = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        for name, dtype in self.COLUMNS.items():
+            dtype, width = dtype if isinstance(dtype, tuple) else (dtype, None)
+            shape = (capacity, width) if width else capacity
+            setattr(self, name, np.zeros(shape, dtype=dtype))
+
+    def _reserve(self, capacity):
+        if capacity <= len(self.code):
+            return
+        old = {name: getattr(self, name) for name in self.COLUMNS}
+        self._allocate(max(capacity, 2 * len(self.code)))
+        for name, column in old.items():
+            getattr(self, name)[:self.size] = column[:self.size]
+
+    def intern(self, text):
+        if text not in self.string_ids:
+            self.string_ids[text] = len(self.strings)
+            self.strings.append(text)
+        return self.string_ids[text]
+
+    def limit(self, civ_id):
+        return self.limits.get(civ_id, self.retention)
+
+    def set_retention(self, civ_id, limit):
+        """Keep at most limit entries (None = all) for one civilization."""
+        self.limits[civ_id] = limit
+        if limit is not None and self.counts.get(civ_id, 0) > limit:
+            self.live -= self.counts[civ_id] - limit
+            self.counts[civ_id] = limit
+
+    def record(self, civ_id, event, *args, x=0.0):
+        """Append an entry; str arguments are interned, ints stored as-is."""
+        self._reserve(self.size + 1)
+        i = self.size
+        self.code[i] = self.CODES[event]
+        self.civ[i] = civ_id
+        self.prev[i] = self.heads.get(civ_id, -1)
+        self.args[i] = 0
+        self.args[i, :len(args)] = [self.intern(arg) if isinstance(arg, str) else arg for arg in args]
+        self.x[i] = x
+        self.heads[civ_id] = i
+        count = self.counts.get(civ_id, 0)
+        limit = self.limit(civ_id)
+        if limit is None or count < limit:
+            self.counts[civ_id] = count + 1
+            self.live += 1
+        self.size += 1
+        if self.size > 1024 and self.size > 2 * self.live:
+            self.compact()
+
+    def entries(self, civ_id):
+        """Indices of a civilization's retained entries, oldest first."""
+        indices = []
+        i = self.heads.get(civ_id, -1)
+        for _ in range(self.counts.get(civ_id, 0)):
+            indices.append(i)
+            i = self.prev[i]
+        return indices[::-1]
+
+    def format(self, i):
+        a, b, c, d = (int(v) for v in self.args[i])
+        strings = self.strings
+        fields = {'a': a, 'x': float(self.x[i])}
+        for key, value in zip(('sa', 'sb', 'sc', 'sd'), (a, b, c, d)):
+            fields[key] = strings[value] if 0 <= value < len(strings) else ''
+        return self.FORMATS[self.code[i]].format(**fields)
+
+    def copy_from(self, other, civ_id):
+        """Append another journal's retained entries for civ_id to this one."""
+        for i in other.entries(civ_id):
+            event = other.EVENTS[other.code[i]]
+            template = other.TEMPLATES[event]
+            args = [other.strings[v] if f'{{s{k}}}' in template else int(v)
+                    for k, v in zip('abcd', other.args[i])]
+            self.record(civ_id, event, *args, x=float(other.x[i]))
+
+    def compact(self):
+        """Drop entries that fell outside their civilization's retention limit."""
+        keep = np.zeros(self.size, dtype=bool)
+        for civ_id in self.heads:
+            keep[self.entries(civ_id)] = True
+        kept = np.flatnonzero(keep)
+        remap = np.full(self.size + 1, -1, dtype=np.int32)  # slot -1 maps dropped links to -1
+        remap[kept] = np.arange(len(kept))
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            column[:len(kept)] = column[kept]
+        self.prev[:len(kept)] = remap[self.prev[:len(kept)]]
+        self.heads = {civ_id: int(remap[i]) for civ_id, i in self.heads.items()}
+        self.size = len(kept)
+
+    def view(self, civ_id):
+        return CivilizationHistory(self, civ_id)
+
+class CivilizationHistory:
+    """List-like view of one civilization's entries in a HistoryJournal."""
+    def __init__(self, journal, civ_id):
+        self.journal = journal
+        self.civ_id = civ_id
+
+    def record(self, event, *args, x=0.0):
+        self.journal.record(self.civ_id, event, *args, x=x)
+
+    def append(self, text):
+        self.journal.record(self.civ_id, 'text', text)
+
+    def __len__(self):
+        return self.journal.counts.get(self.civ_id, 0)
+
+    def __getitem__(self, index):
+        entries = self.journal.entries(self.civ_id)
+        if isinstance(index, slice):
+            return [self.journal.format(i) for i in entries[index]]
+        return self.journal.format(entries[index])
+
+    def __iter__(self):
+        return (self.journal.format(i) for i in self.journal.entries(self.civ_id))
+
+    def __repr__(self):
+        return repr(list(self))
 
 class Civilization:
     """
@@ -17,7 +323,10 @@ class Civilization:
         religion: Main religion
         economy: Economic system
         status: 'alive' or 'collapsed'
-        history: List of events
+        history: List-like view of the civilization's events
+    Numeric state and traits live in a CivilizationTable row (`table`, `row`)
+    and history in a HistoryJournal (`journal`); a new civilization gets
+    private ones until it is attached to a galaxy's shared table and journal.
     """
     GOVERNMENTS = ['democracy', 'monarchy', 'theocracy', 'republic', 'dictatorship', 'anarchy']
     ECONOMIES = ['capitalist', 'socialist', 'mixed', 'planned']
@@ -26,19 +335,87 @@ class Civilization:
 
     def __init__(self, id, home_planet, traits):
         self.id = id
+        population = random.randint(1_000_000, 10_000_000)
+        growth_rate = random.uniform(0.01, 0.05)
+        self.table = CivilizationTable(capacity=1)
+        self.row = self.table.append(id, population, growth_rate, home_planet.resources,
+                                     traits=[traits.get(t, 0.5) for t in CivilizationTable.TRAITS])
         self.home_planet = home_planet
         self.planets = [home_planet]
-        self.population = random.randint(1_000_000, 10_000_000)
-        self.growth_rate = random.uniform(0.01, 0.05)
-        self.tech_level = 1
-        self.resources = home_planet.resources
-        self.traits = traits  # aggression, curiosity, risk_tolerance
         self.government = random.choice(self.GOVERNMENTS)
         self.language = random.choice(self.LANGUAGES)
         self.religion = random.choice(self.RELIGIONS)
         self.economy = random.choice(self.ECONOMIES)
-        self.status = 'alive'
-        self.history = []
+        self.journal = HistoryJournal()
+
+    def attach(self, table, journal=None):
+        """Move this civilization's state into another table (and journal), e.g. a galaxy's."""
+        self.row = table.copy_row(self.table, self.row)
+        self.table = table
+        if journal is not None:
+            journal.copy_from(self.journal, self.id)
+            self.journal = journal
+
+    @property
+    def history(self):
+        return self.journal.view(self.id)
+
+    @property
+    def home_planet(self):
+        return self._home_planet
+
+    @home_planet.setter
+    def home_planet(self, planet):
+        self._home_planet = planet
+        self.table.home_star[self.row] = planet.star.id
+
+    @property
+    def population(self):
+        return int(self.table.population[self.row])
+
+    @population.setter
+    def population(self, value):
+        self.table.set_population(self.row, value)
+
+    @property
+    def growth_rate(self):
+        return float(self.table.growth_rate[self.row])
+
+    @growth_rate.setter
+    def growth_rate(self, value):
+        self.table.growth_rate[self.row] = value
+
+    @property
+    def resources(self):
+        return int(self.table.resources[self.row])
+
+    @resources.setter
+    def resources(self, value):
+        self.table.resources[self.row] = value
+
+    @property
+    def tech_level(self):
+        return int(self.table.tech_level[self.row])
+
+    @tech_level.setter
+    def tech_level(self, value):
+        self.table.set_tech_level(self.row, value)
+
+    @property
+    def status(self):
+        return CivilizationTable.STATUSES[self.table.status[self.row]]
+
+    @status.setter
+    def status(self, value):
+        self.table.set_status(self.row, CivilizationTable.STATUSES.index(value))
+
+    @property
+    def traits(self):
+        return Traits(self)  # aggression, curiosity, risk_tolerance
+
+    @traits.setter
+    def traits(self, values):
+        self.table.traits[self.row] = [values.get(t, 0.5) for t in CivilizationTable.TRAITS]
 
     def grow(self):
         """Simulate population growth and resource consumption."""
@@ -51,30 +428,30 @@ class Civilization:
     def collapse(self, reason):
         """Collapse the civilization for a given reason."""
         self.status = 'collapsed'
-        self.history.append(f'Collapsed due to {reason}')
+        self.history.record('collapsed', reason)
 
     def expand(self, galaxy):
         """Attempt to colonize a nearby planet with life."""
         if self.status != 'alive':
             return
-        for planet in galaxy.get_nearby_planets(self.home_planet, max_distance=20):
-            if planet.civilization is None and planet.has_life:
-                planet.civilization = self
-                self.planets.append(planet)
-                self.resources += planet.resources
-                self.history.append(f'Colonized planet {planet.id}')
-                break
+        candidates = galaxy.nearby_planet_ids(self.home_planet, max_distance=20, require_life=True)
+        if len(candidates):
+            planet = galaxy.planets[candidates[0]]
+            planet.civilization = self
+            self.planets.append(planet)
+            self.resources += planet.resources
+            self.history.record('colonized', planet.id)
 
     def reform_government(self, new_gov):
         """Change the government type."""
         self.government = new_gov
-        self.history.append(f'Reformed government to {new_gov}')
+        self.history.record('reformed', new_gov)
 
     def cultural_change(self, trait, delta):
         """Change a cultural trait by delta."""
         if trait in self.traits:
             self.traits[trait] = min(max(self.traits[trait] + delta, 0), 1)
-            self.history.append(f'Cultural trait {trait} changed by {delta}')
+            self.history.record('trait_changed', trait, x=delta)
 
     def revolution(self):
         """Simulate a revolution: randomize government, economy, and possibly religion."""
@@ -84,4 +461,4 @@ class Civilization:
         self.economy = random.choice(self.ECONOMIES)
         if random.random() < 0.5:
             self.religion = random.choice(self.RELIGIONS)
-        self.history.append(f'Revolution! Gov: {old_gov}->{self.government}, Econ: {old_econ}->{self.economy}') 
\ No newline at end of file
+        self.history.record('revolution', old_gov, self.government, old_econ, self.economy) 
\ No newline at end of file
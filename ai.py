@@ -1,14 +1,167 @@
 import random
 import numpy as np
+from collections import deque
+
+STRATEGIES = ['war', 'expand', 'trade', 'isolate']
+
+def strategy_weights(traits):
+    """
+    Strategy weights for many civilizations at once.
+    traits is an (n, 3) matrix of aggression, curiosity and risk_tolerance
+    (CivilizationTable.traits); returns (n, len(STRATEGIES)) weights.
+    """
+    aggression, curiosity, risk = traits[:, 0], traits[:, 1], traits[:, 2]
+    return np.column_stack([aggression, curiosity, risk, 1 - aggression])
+
+class PopulationPolicy:
+    """
+    Chooses strategies for a whole population of civilizations at once.
+    Weights are computed from the trait matrix, and every civilization's
+    strategy is sampled from one uniform draw, with the same cumulative-weight
+    rule as random.choices. Each row's recent choices are kept in a bounded
+    ring buffer.
+    """
+    def __init__(self, memory_size=32):
+        self.memory_size = memory_size
+        self.memory = np.zeros((0, memory_size), dtype=np.int8)
+        self.memory_count = np.zeros(0, dtype=np.int64)  # total choices recorded per row
+        self.strategy = np.zeros(0, dtype=np.int8)
+
+    def choose(self, traits):
+        """Sample one strategy index per row of the trait matrix."""
+        cumulative = np.cumsum(strategy_weights(traits), axis=1)
+        r = np.random.rand(len(cumulative)) * cumulative[:, -1]
+        return np.minimum((cumulative <= r[:, None]).sum(axis=1), len(STRATEGIES) - 1)
+
+    def choose_for(self, table, rows, at_war=None):
+        """Choose and remember strategies for the given rows of a CivilizationTable."""
+        choices = self.choose(table.traits[rows])
+        self.remember(rows, choices)
+        return choices
+
+    def remember(self, rows, choices):
+        size = len(self.strategy)
+        if len(rows) and rows.max() >= size:
+            grow = max(rows.max() + 1, 2 * size) - size
+            self.memory = np.vstack([self.memory, np.zeros((grow, self.memory_size), dtype=np.int8)])
+            self.memory_count = np.concatenate([self.memory_count, np.zeros(grow, dtype=np.int64)])
+            self.strategy = np.concatenate([self.strategy, np.zeros(grow, dtype=np.int8)])
+        self.memory[rows, self.memory_count[rows] % self.memory_size] = choices
+        self.memory_count[rows] += 1
+        self.strategy[rows] = choices
+
+    def recent(self, row):
+        """Return a row's remembered strategies, oldest first."""
+        count = int(self.memory_count[row])
+        slots = np.arange(max(0, count - self.memory_size), count) % self.memory_size
+        return [STRATEGIES[i] for i in self.memory[row, slots]]
+
+class QLearningPolicy:
+    """
+    Tabular Q-learning shared by a population of civilizations.
+    A civ's state is discretized into (population bucket, resource bucket,
+    tech level, at war) and flattened into a row index of one Q-table with a
+    column per strategy. Selection is epsilon-greedy and updates are applied
+    to every civ in a single batched TD step.
+    Attributes:
+        q: (n_states, len(STRATEGIES)) action values
+        alpha: Learning rate
+        gamma: Discount factor
+        epsilon: Exploration rate
+        population_edges: log10 population bucket edges
+        resource_edges: log10 resource bucket edges
+        max_tech: Tech levels at or above this share the last bucket
+    """
+    def __init__(self, alpha=0.1, gamma=0.9, epsilon=0.1,
+                 population_edges=range(6, 13), resource_edges=range(5, 11), max_tech=16):
+        self.alpha = alpha
+        self.gamma = gamma
+        self.epsilon = epsilon
+        self.population_edges = np.asarray(population_edges, dtype=float)
+        self.resource_edges = np.asarray(resource_edges, dtype=float)
+        self.max_tech = max_tech
+        self.shape = (len(self.population_edges) + 1, len(self.resource_edges) + 1, max_tech, 2)
+        self.q = np.zeros((int(np.prod(self.shape)), len(STRATEGIES)))
+        # Last (state, action, population) per table row, pending its reward; action -1 = none
+        self.last_state = np.zeros(0, dtype=np.int64)
+        self.last_action = np.full(0, -1, dtype=np.int8)
+        self.last_population = np.zeros(0)
+
+    def encode(self, population, resources, tech_level, at_war):
+        """Map state variables (scalars or arrays) to Q-table row indices."""
+        population = np.log10(np.maximum(population, 1))
+        resources = np.log10(np.maximum(resources, 1))
+        return np.ravel_multi_index((np.digitize(population, self.population_edges),
+                                     np.digitize(resources, self.resource_edges),
+                                     np.clip(tech_level, 0, self.max_tech - 1),
+                                     np.asarray(at_war, dtype=np.int64)), self.shape)
+
+    def encode_rows(self, table, rows, at_war=None):
+        if at_war is None:
+            at_war = np.zeros(len(rows), dtype=bool)
+        return self.encode(table.population[rows], table.resources[rows], table.tech_level[rows], at_war)
+
+    def choose(self, states):
+        """Epsilon-greedy action index for every state."""
+        states = np.asarray(states)
+        actions = self.q[states].argmax(axis=-1)
+        explore = np.random.rand(*states.shape) < self.epsilon
+        return np.where(explore, np.random.randint(0, len(STRATEGIES), states.shape), actions)
+
+    def update(self, states, actions, rewards, next_states, done=None):
+        """
+        One TD(0) update for a batch of transitions; done marks terminal ones.
+        Repeated (state, action) pairs accumulate. Returns the TD errors.
+        """
+        future = self.q[next_states].max(axis=-1)
+        if done is not None:
+            future = np.where(done, 0, future)
+        td = rewards + self.gamma * future - self.q[states, actions]
+        np.add.at(self.q, (states, actions), self.alpha * td)
+        return td
+
+    def choose_for(self, table, rows, at_war=None):
+        """
+        Learn from the rows' previous choices, then choose their next
+        strategies. The reward for a step is the log population growth since
+        the last choice; a civ that has since collapsed gets -1 as terminal.
+        """
+        states = self.encode_rows(table, rows, at_war)
+        self._reserve(rows.max() + 1 if len(rows) else 0)
+        pending = np.flatnonzero(self.last_action >= 0)
+        if len(pending):
+            position = np.full(len(self.last_action), -1)
+            position[rows] = np.arange(len(rows))
+            here = position[pending]
+            done = (here < 0) | (table.status[pending] != 0)
+            growth = np.log(np.maximum(table.population[pending], 1) / np.maximum(self.last_population[pending], 1))
+            rewards = np.where(done, -1.0, growth)
+            next_states = np.where(here < 0, 0, states[here])
+            self.update(self.last_state[pending], self.last_action[pending], rewards, next_states, done)
+            self.last_action[pending] = -1
+        actions = self.choose(states)
+        self.last_state[rows] = states
+        self.last_action[rows] = actions
+        self.last_population[rows] = table.population[rows]
+        return actions
+
+    def _reserve(self, size):
+        n = len(self.last_action)
+        if size > n:
+            grow = max(size, 2 * n) - n
+            self.last_state = np.concatenate([self.last_state, np.zeros(grow, dtype=np.int64)])
+            self.last_action = np.concatenate([self.last_action, np.full(grow, -1, dtype=np.int8)])
+            self.last_population = np.concatenate([self.last_population, np.zeros(grow)])
 
 class CivilizationAI:
     """
     Handles adaptive behavior and learning for civilizations.
     Includes stubs for RL, evolutionary algorithms, and trait mutation.
     """
-    def __init__(self, civilization):
+    def __init__(self, civilization, memory_size=100, learner=None):
         self.civilization = civilization
-        self.memory = []  # Stores past actions and outcomes
+        self.learner = learner  # Shared QLearningPolicy, if any
+        self.memory = deque(maxlen=memory_size)  # Recent actions and outcomes (ring buffer)
         self.strategy = 'expand'  # Default strategy
 
     def choose_strategy(self, context):
@@ -20,8 +173,7 @@ class CivilizationAI:
         curiosity = self.civilization.traits.get('curiosity', 0.5)
         risk = self.civilization.traits.get('risk_tolerance', 0.5)
         weights = [aggression, curiosity, risk, 1 - aggression]
-        strategies = ['war', 'expand', 'trade', 'isolate']
-        chosen = random.choices(strategies, weights=weights, k=1)[0]
+        chosen = random.choices(STRATEGIES, weights=weights, k=1)[0]
         self.strategy = chosen
         self.memory.append((context, chosen))
         return chosen
@@ -56,7 +208,8 @@ class CivilizationAI:
     def evolutionary_algorithm(self, population):
         """
         Evolve a population of civilizations using selection, crossover, and mutation.
-        Placeholder for future expansion.
+        Fitness here is current population; evolution.evolve evaluates trait
+        genomes by running simulations in parallel instead.
         """
         # Select top civilizations by population
         sorted_pop = sorted(population, key=lambda c: c.population, reverse=True)
@@ -76,17 +229,34 @@ class CivilizationAI:
                     child.traits[trait] = min(max(child.traits[trait], 0), 1)
         return survivors + children
 
+    def state(self, at_war=False):
+        """Current (population, resources, tech_level, at_war) state of the civilization."""
+        civ = self.civilization
+        return (civ.population, civ.resources, civ.tech_level, at_war)
+
     def q_learning_update(self, state, action, reward, next_state):
         """
-        Placeholder for Q-learning update. In a real implementation, would update Q-table or neural net.
+        Apply one Q-learning update to the shared learner.
+        States are (population, resources, tech_level, at_war) tuples and the
+        action is a strategy name.
         """
-        pass
+        if self.learner is None:
+            self.learner = QLearningPolicy()
+        learner = self.learner
+        learner.update(np.array([learner.encode(*state)]), np.array([STRATEGIES.index(action)]),
+                       np.array([reward], dtype=float), np.array([learner.encode(*next_state)]))
 
     def policy(self, state):
         """
-        Placeholder for policy function. Would select action based on learned Q-values or policy network.
+        Select a strategy from the learned Q-values (epsilon-greedy), or by
+        traits when no learner is attached.
         """
-        return self.choose_strategy(state)
+        if self.learner is None:
+            return self.choose_strategy(state)
+        chosen = STRATEGIES[int(self.learner.choose(self.learner.encode(*state)))]
+        self.strategy = chosen
+        self.memory.append((state, chosen))
+        return chosen
 
 # Example usage:
 # ai = CivilizationAI(civ)
@@ -0,0 +1,202 @@
+import argparse
+import itertools
+import os
+import random
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from galaxy import Galaxy
+from simulation import Simulation
+
+
+def run_one(seed, n_stars=1000, n_civs=10, steps=100, vectorized=False, template=None):
+    """
+    Run one headless simulation and return (seed, columns, stats block).
+    With a GalaxyTemplate the run attaches to the shared galaxy instead of
+    generating its own. Generated galaxies skip the on-disk cache, since an
+    ensemble sweeps seeds that are rarely reused.
+    """
+    galaxy = Galaxy.attach(template) if template is not None else None
+    sim = Simulation(n_stars, n_civs, seed, vectorized=vectorized, galaxy=galaxy, galaxy_cache=False)
+    history = sim.run(steps)
+    return seed, history.columns, history.data[:len(history)].copy()
+
+
+class EnsembleStats:
+    """
+    Per-step statistics across an ensemble of runs, updated one run at a time.
+    Means and variances use Welford's algorithm over whole (steps, metrics)
+    blocks; quantiles come from a fixed-size reservoir sample of runs, so
+    memory does not grow with the number of runs.
+    Attributes:
+        columns: Metric names (including 'step')
+        count: Number of runs added
+        mean: (steps, metrics) running mean
+        m2: (steps, metrics) running sum of squared deviations
+        reservoir: (size, steps, metrics) sampled runs
+    """
+    def __init__(self, columns, steps, reservoir=256, seed=0):
+        self.columns = list(columns)
+        self.count = 0
+        self.mean = np.zeros((steps, len(self.columns)))
+        self.m2 = np.zeros_like(self.mean)
+        self.reservoir = np.zeros((reservoir,) + self.mean.shape)
+        self.rng = random.Random(seed)
+
+    def add(self, data):
+        self.count += 1
+        delta = data - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (data - self.mean)
+        size = len(self.reservoir)
+        if self.count <= size:
+            self.reservoir[self.count - 1] = data
+        else:
+            slot = self.rng.randrange(self.count)
+            if slot < size:
+                self.reservoir[slot] = data
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.zeros_like(self.mean)
+
+    def confidence_band(self, z=1.96):
+        """Normal-approximation band for the mean (95% by default)."""
+        half = z * self.std / np.sqrt(max(self.count, 1))
+        return self.mean - half, self.mean + half
+
+    def quantiles(self, q):
+        """(len(q), steps, metrics) quantiles estimated from the reservoir."""
+        return np.quantile(self.reservoir[:min(self.count, len(self.reservoir))], q, axis=0)
+
+    def summary(self, metric, quantiles=(0.05, 0.5, 0.95)):
+        """Per-step mean, 95% confidence band and quantiles of one metric."""
+        i = self.columns.index(metric)
+        low, high = self.confidence_band()
+        frame = pd.DataFrame({
+            'step': np.arange(len(self.mean)),
+            'mean': self.mean[:, i],
+            'std': self.std[:, i],
+            'ci_low': low[:, i],
+            'ci_high': high[:, i],
+        })
+        if self.count:
+            for q, values in zip(quantiles, self.quantiles(quantiles)):
+                frame[f'q{round(q * 100):02d}'] = values[:, i]
+        return frame
+
+
+def iter_ensemble(seeds, n_stars=1000, n_civs=10, steps=100, workers=None, max_in_flight=None,
+                  cancel=None, vectorized=False, galaxy_seed=None):
+    """
+    Yield (seed, columns, stats block) for each run as it finishes.
+    At most max_in_flight runs (default twice the pool size) are submitted at
+    a time, so seeds may be a long or lazy iterable. Setting the `cancel`
+    event stops new submissions and cancels runs that have not started;
+    workers=1 runs in this process. With galaxy_seed, one galaxy is generated
+    up front and shared with every run through shared memory, so runs differ
+    only in civilization seeding and later randomness.
+    """
+    seeds = iter(seeds)
+    cancel = cancel or threading.Event()
+    template = Galaxy(n_stars, galaxy_seed).share() if galaxy_seed is not None else None
+    workers = workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(workers) if workers > 1 else None
+    max_in_flight = max_in_flight or 2 * workers
+    pending = set()
+    try:
+        if executor is None:
+            for seed in seeds:
+                if cancel.is_set():
+                    return
+                yield run_one(seed, n_stars, n_civs, steps, vectorized, template)
+            return
+        while True:
+            if not cancel.is_set():
+                for seed in itertools.islice(seeds, max_in_flight - len(pending)):
+                    pending.add(executor.submit(run_one, seed, n_stars, n_civs, steps, vectorized, template))
+            if not pending:
+                return
+            done, pending = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+            for future in done:
+                if not future.cancelled():
+                    yield future.result()
+            if cancel.is_set():
+                for future in pending:
+                    future.cancel()
+    finally:
+        for future in pending:
+            future.cancel()
+        if executor is not None:
+            executor.shutdown()
+        if template is not None:
+            template.unlink()
+
+
+def run_ensemble(seeds, n_stars=1000, n_civs=10, steps=100, workers=None, max_in_flight=None,
+                 cancel=None, on_result=None, reservoir=256, vectorized=False, galaxy_seed=None):
+    """
+    Run Simulation(n_stars, n_civs, seed).run(steps) for every seed across a
+    process pool and aggregate the stats histories into an EnsembleStats.
+    on_result(seed, stats_frame) is called as each run finishes. If `cancel`
+    is set, the statistics of the runs finished so far are returned.
+    galaxy_seed shares one galaxy across all runs (see iter_ensemble);
+    vectorized=True uses Simulation.step_vectorized instead of step.
+    """
+    stats = None
+    for seed, columns, data in iter_ensemble(seeds, n_stars, n_civs, steps, workers,
+                                              max_in_flight, cancel, vectorized, galaxy_seed):
+        if stats is None:
+            stats = EnsembleStats(columns, steps, reservoir)
+        stats.add(data)
+        if on_result is not None:
+            on_result(seed, pd.DataFrame(data, columns=columns))
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run a Monte Carlo ensemble of galactic simulations.')
+    parser.add_argument('--runs', type=int, default=100, help='number of seeds to run')
+    parser.add_argument('--first-seed', type=int, default=0)
+    parser.add_argument('--stars', type=int, default=1000)
+    parser.add_argument('--civs', type=int, default=10)
+    parser.add_argument('--steps', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None, help='processes (default: all cores)')
+    parser.add_argument('--galaxy-seed', type=int, default=None,
+                        help='generate one galaxy with this seed and share it across all runs')
+    parser.add_argument('--vectorized', action='store_true',
+                        help='use the vectorized step instead of the default per-civilization step')
+    parser.add_argument('--metric', default='total_population')
+    parser.add_argument('--output', help='write the summary to this CSV file instead of stdout')
+    args = parser.parse_args(argv)
+
+    seeds = range(args.first_seed, args.first_seed + args.runs)
+    stats = None
+    # Ctrl-C stops the ensemble and summarizes the runs finished so far
+    try:
+        for seed, columns, data in iter_ensemble(seeds, args.stars, args.civs, args.steps, args.workers,
+                                                 vectorized=args.vectorized, galaxy_seed=args.galaxy_seed):
+            if stats is None:
+                stats = EnsembleStats(columns, args.steps)
+            stats.add(data)
+            print(f'\r{stats.count}/{args.runs} runs', end='', file=sys.stderr, flush=True)
+    except KeyboardInterrupt:
+        print('\ninterrupted', end='', file=sys.stderr)
+    print(file=sys.stderr)
+    if stats is None:
+        print('no runs finished')
+        return 1
+    summary = stats.summary(args.metric)
+    if args.output:
+        summary.to_csv(args.output, index=False)
+    else:
+        print(summary.to_string(index=False))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,4 +1,9 @@
+import heapq
+import json
 import random
+import time
+import numpy as np
+import pandas as pd
 
 class CosmicEvent:
     """
@@ -22,82 +27,308 @@ class CivilizationEvent:
     def trigger(self, civilization):
         self.effect(civilization)
 
+EVENT_MESSAGES = {
+    'supernova': "Supernova at star {star}! All planets sterilized.",
+    'asteroid_impact': "Asteroid impact on planet {planet}!",
+    'black_hole': "Black hole devoured star {star}!",
+    'revolt': "Civilization {civ} collapsed due to revolt!",
+    'golden_age': "Civilization {civ} entered a Golden Age!",
+    'plague': "Civilization {civ} hit by a plague! Population reduced.",
+    'resource_boom': "Civilization {civ} experienced a resource boom!",
+    'resource_crash': "Civilization {civ} suffered a resource crash!",
+}
+EVENT_TYPES = list(EVENT_MESSAGES)
+EVENT_CODES = {name: code for code, name in enumerate(EVENT_TYPES)}
+
+class EventRecords:
+    """
+    Compact in-memory event sink.
+    Records are (step, type, civ, star, planet, payload) rows of a NumPy
+    structured array, with -1 for ids that do not apply. Message text is
+    formatted only when a record is read, so the buffer still behaves like
+    the old list of log strings.
+    """
+    DTYPE = np.dtype([('step', np.int32), ('type', np.uint8), ('civ', np.int32),
+                      ('star', np.int32), ('planet', np.int32), ('payload', np.float64)])
+
+    def __init__(self, capacity=1024):
+        self.data = np.zeros(capacity, dtype=self.DTYPE)
+        self.size = 0
+
+    def write(self, records):
+        if self.size + len(records) > len(self.data):
+            data = np.zeros(max(2 * len(self.data), self.size + len(records)), dtype=self.DTYPE)
+            data[:self.size] = self.data[:self.size]
+            self.data = data
+        self.data[self.size:self.size + len(records)] = records
+        self.size += len(records)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def records(self):
+        return self.data[:self.size]
+
+    @staticmethod
+    def format(record):
+        return EVENT_MESSAGES[EVENT_TYPES[record['type']]].format(
+            civ=record['civ'], star=record['star'], planet=record['planet'])
+
+    def to_frame(self, start=0, stop=None):
+        """DataFrame of records[start:stop] with their formatted messages."""
+        records = self.records()[start:stop]
+        df = pd.DataFrame(records)
+        df['type'] = np.array(EVENT_TYPES)[records['type']]
+        df['message'] = [self.format(record) for record in records]
+        return df
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.format(record) for record in self.records()[index]]
+        return self.format(self.records()[index])
+
+    def __iter__(self):
+        for record in self.records():
+            yield self.format(record)
+
+class NullSink:
+    """Event sink that discards everything."""
+    def write(self, records):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+class FileSink:
+    """
+    Event sink that appends records to a file as NDJSON lines.
+    Records are buffered and written batch_size at a time.
+    """
+    def __init__(self, path, batch_size=4096):
+        self.path = path
+        self.batch_size = batch_size
+        self.pending = []
+        self.file = open(path, 'a')
+
+    def write(self, records):
+        self.pending.append(records)
+        if sum(len(r) for r in self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        lines = []
+        for record in np.concatenate(self.pending) if self.pending else ():
+            line = {name: record[name].item() for name in EventRecords.DTYPE.names}
+            line['type'] = EVENT_TYPES[line['type']]
+            line['message'] = EventRecords.format(record)
+            lines.append(json.dumps(line) + '\n')
+        self.file.writelines(lines)
+        self.file.flush()
+        self.pending = []
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+class ConsoleSink:
+    """
+    Event sink that prints messages, at most one line every min_interval
+    seconds; events in between are summarised by count on the next line,
+    or by close() if no line follows.
+    """
+    def __init__(self, min_interval=1.0):
+        self.min_interval = min_interval
+        self.last_print = -np.inf
+        self.skipped = 0
+
+    def write(self, records):
+        if not len(records):
+            return
+        now = time.monotonic()
+        if now - self.last_print < self.min_interval:
+            self.skipped += len(records)
+            return
+        msg = EventRecords.format(records[-1])
+        skipped = self.skipped + len(records) - 1
+        print(f"{msg} (+{skipped} more events)" if skipped else msg)
+        self.last_print = now
+        self.skipped = 0
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self.skipped:
+            print(f"(+{self.skipped} more events)")
+            self.skipped = 0
+
 class EventManager:
     """
     Manages random events in the simulation.
     Handles both cosmic and civilization events, with detailed logging.
+    By default every event is rolled on every step. With scheduled=True the
+    manager instead draws each event's next firing step from a geometric
+    distribution and keeps those times in a priority queue, so a step only
+    touches the events that actually fire. Both modes give the same
+    per-step firing probabilities.
+    Events are emitted as typed records to a list of sinks at the end of
+    each pass. By default the only sink is `log`, an in-memory EventRecords;
+    console=True adds a rate-limited ConsoleSink.
     """
-    def __init__(self, galaxy):
+    COSMIC_EVENTS = [('supernova', 0.01), ('asteroid_impact', 0.01), ('black_hole', 0.005)]
+    CIVILIZATION_EVENTS = [('revolt', 0.02), ('golden_age', 0.01), ('plague', 0.01),
+                           ('resource_boom', 0.01), ('resource_crash', 0.01)]
+
+    def __init__(self, galaxy, scheduled=False, sinks=None, console=False):
         self.galaxy = galaxy
         self.events = []
-        self.log = []
+        self.log = EventRecords()
+        self.sinks = [self.log] if sinks is None else list(sinks)
+        if console:
+            self.sinks.append(ConsoleSink())
+        self.pending = []
+        self.scheduled = scheduled
+        self.cosmic_step = 0
+        self.civ_step = 0
+        self.cosmic_queue = []  # heap of (step, event index)
+        self.civ_queue = []  # heap of (step, civ row, event index)
+        self.scheduled_civs = 0
+
+    def __getstate__(self):
+        # File and console sinks hold OS resources; a restored manager keeps only in-memory ones
+        state = self.__dict__.copy()
+        state['sinks'] = [sink for sink in self.sinks if isinstance(sink, (EventRecords, NullSink))]
+        return state
 
     def maybe_trigger_cosmic_event(self):
-        # Supernova
-        if random.random() < 0.01:
-            star = random.choice(self.galaxy.stars)
-            for planet in star.planets:
-                planet.has_life = False
-                planet.has_intelligent_life = False
-                planet.civilization = None
-            msg = f"Supernova at star {star.id}! All planets sterilized."
-            print(msg)
-            self.log.append(msg)
-        # Asteroid impact
-        if random.random() < 0.01:
-            planet = random.choice(self.galaxy.planets)
+        if self.scheduled:
+            self._fire_scheduled_cosmic_events()
+        else:
+            for name, p in self.COSMIC_EVENTS:
+                if random.random() < p:
+                    getattr(self, name)()
+        self.cosmic_step += 1
+        self.flush()
+
+    def maybe_trigger_civilization_event(self):
+        if self.scheduled:
+            self._fire_scheduled_civilization_events()
+        else:
+            for civ in self.galaxy.civilizations:
+                if civ.status == 'alive':
+                    for name, p in self.CIVILIZATION_EVENTS:
+                        if random.random() < p:
+                            getattr(self, name)(civ)
+        self.civ_step += 1
+        self.flush()
+
+    def emit(self, event_type, step, civ=-1, star=-1, planet=-1, payload=0):
+        self.pending.append((step, EVENT_CODES[event_type], civ, star, planet, payload))
+
+    def flush(self):
+        """Hand pending records to every sink as one batch."""
+        if self.pending:
+            records = np.array(self.pending, dtype=EventRecords.DTYPE)
+            self.pending = []
+            for sink in self.sinks:
+                sink.write(records)
+
+    def close(self):
+        self.flush()
+        for sink in self.sinks:
+            sink.close()
+
+    def _fire_scheduled_cosmic_events(self):
+        # Steps are counted from 1 here: an event due at step k fires on the k-th call
+        if not self.cosmic_queue:
+            self.cosmic_queue = [(int(np.random.geometric(p)), i) for i, (_, p) in enumerate(self.COSMIC_EVENTS)]
+            heapq.heapify(self.cosmic_queue)
+        now = self.cosmic_step + 1
+        while self.cosmic_queue[0][0] <= now:
+            step, i = heapq.heappop(self.cosmic_queue)
+            name, p = self.COSMIC_EVENTS[i]
+            getattr(self, name)()
+            heapq.heappush(self.cosmic_queue, (step + int(np.random.geometric(p)), i))
+
+    def _fire_scheduled_civilization_events(self):
+        civs = self.galaxy.civilizations
+        # Civilizations added since the last call get their first firing times drawn in one batch
+        new = len(civs) - self.scheduled_civs
+        if new > 0:
+            rows = range(self.scheduled_civs, len(civs))
+            for i, (_, p) in enumerate(self.CIVILIZATION_EVENTS):
+                for row, wait in zip(rows, np.random.geometric(p, new)):
+                    heapq.heappush(self.civ_queue, (self.civ_step + int(wait), row, i))
+            self.scheduled_civs = len(civs)
+        now = self.civ_step + 1
+        # As in polling mode, a civ alive at the start of the step gets all its events
+        alive = self.galaxy.civ_table.status[:len(civs)] == 0
+        while self.civ_queue and self.civ_queue[0][0] <= now:
+            step, row, i = heapq.heappop(self.civ_queue)
+            if not alive[row]:
+                continue  # collapsed civilizations never recover, so drop their events
+            name, p = self.CIVILIZATION_EVENTS[i]
+            getattr(self, name)(civs[row])
+            heapq.heappush(self.civ_queue, (step + int(np.random.geometric(p)), row, i))
+
+    def supernova(self):
+        star = random.choice(self.galaxy.stars)
+        for planet in star.planets:
             planet.has_life = False
             planet.has_intelligent_life = False
-            if planet.civilization:
-                planet.civilization.collapse('asteroid impact')
-            msg = f"Asteroid impact on planet {planet.id}!"
-            print(msg)
-            self.log.append(msg)
-        # Black hole event
-        if random.random() < 0.005:
-            star = random.choice(self.galaxy.stars)
-            for planet in star.planets:
-                planet.has_life = False
-                planet.has_intelligent_life = False
-                planet.civilization = None
-            msg = f"Black hole devoured star {star.id}!"
-            print(msg)
-            self.log.append(msg)
+            planet.civilization = None
+        self.emit('supernova', self.cosmic_step, star=star.id)
 
-    def maybe_trigger_civilization_event(self):
-        for civ in self.galaxy.civilizations:
-            if civ.status == 'alive':
-                # Revolt
-                if random.random() < 0.02:
-                    civ.collapse('internal revolt')
-                    msg = f"Civilization {civ.id} collapsed due to revolt!"
-                    print(msg)
-                    self.log.append(msg)
-                # Golden age
-                if random.random() < 0.01:
-                    civ.growth_rate *= 1.5
-                    civ.history.append('Golden Age! Growth rate increased.')
-                    msg = f"Civilization {civ.id} entered a Golden Age!"
-                    print(msg)
-                    self.log.append(msg)
-                # Plague
-                if random.random() < 0.01:
-                    civ.population = int(civ.population * 0.7)
-                    civ.history.append('Plague! Population reduced.')
-                    msg = f"Civilization {civ.id} hit by a plague! Population reduced."
-                    print(msg)
-                    self.log.append(msg)
-                # Resource boom
-                if random.random() < 0.01:
-                    civ.resources += int(civ.resources * 0.5)
-                    civ.history.append('Resource boom! Resources increased.')
-                    msg = f"Civilization {civ.id} experienced a resource boom!"
-                    print(msg)
-                    self.log.append(msg)
-                # Resource crash
-                if random.random() < 0.01:
-                    civ.resources = int(civ.resources * 0.5)
-                    civ.history.append('Resource crash! Resources halved.')
-                    msg = f"Civilization {civ.id} suffered a resource crash!"
-                    print(msg)
-                    self.log.append(msg) 
\ No newline at end of file
+    def asteroid_impact(self):
+        planet = random.choice(self.galaxy.planets)
+        planet.has_life = False
+        planet.has_intelligent_life = False
+        if planet.civilization:
+            planet.civilization.collapse('asteroid impact')
+        self.emit('asteroid_impact', self.cosmic_step, star=planet.star.id, planet=planet.id)
+
+    def black_hole(self):
+        star = random.choice(self.galaxy.stars)
+        for planet in star.planets:
+            planet.has_life = False
+            planet.has_intelligent_life = False
+            planet.civilization = None
+        self.emit('black_hole', self.cosmic_step, star=star.id)
+
+    def revolt(self, civ):
+        civ.collapse('internal revolt')
+        self.emit('revolt', self.civ_step, civ=civ.id, star=civ.table.home_star[civ.row])
+
+    def golden_age(self, civ):
+        civ.growth_rate *= 1.5
+        civ.history.record('golden_age')
+        self.emit('golden_age', self.civ_step, civ=civ.id, star=civ.table.home_star[civ.row])
+
+    def plague(self, civ):
+        population = civ.population
+        civ.population = int(population * 0.7)
+        civ.history.record('plague')
+        self.emit('plague', self.civ_step, civ=civ.id, star=civ.table.home_star[civ.row],
+                  payload=population - civ.population)
+
+    def resource_boom(self, civ):
+        gain = int(civ.resources * 0.5)
+        civ.resources += gain
+        civ.history.record('resource_boom')
+        self.emit('resource_boom', self.civ_step, civ=civ.id, star=civ.table.home_star[civ.row], payload=gain)
+
+    def resource_crash(self, civ):
+        resources = civ.resources
+        civ.resources = int(resources * 0.5)
+        civ.history.record('resource_crash')
+        self.emit('resource_crash', self.civ_step, civ=civ.id, star=civ.table.home_star[civ.row],
+                  payload=resources - civ.resources)
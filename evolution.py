@@ -0,0 +1,121 @@
+import glob
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from agents import CivilizationTable
+from ai import PopulationPolicy
+from simulation import Simulation
+
+
+def random_genome(rng):
+    return {trait: rng.random() for trait in CivilizationTable.TRAITS}
+
+
+def evaluate(genome, n_stars=100000, n_civs=10, steps=100, seeds=(42,)):
+    """
+    Fitness of a trait genome: the mean final total population over headless
+    simulations, one per seed, in which every civilization carries the genome's
+    traits and a PopulationPolicy picks their strategies. Each run seeds the
+    global RNGs itself, so the result does not depend on the calling process.
+    """
+    total = 0.0
+    for seed in seeds:
+        sim = Simulation(n_stars, n_civs, seed, vectorized=True, policy=PopulationPolicy())
+        table = sim.galaxy.civ_table
+        table.traits[:table.size] = [genome.get(t, 0.5) for t in CivilizationTable.TRAITS]
+        sim.run(steps)
+        total += sim.stats_history.column('total_population')[-1] if steps else table.alive_population
+    return float(total / len(seeds))
+
+
+def breed(ranked, size, elite, mutation_rate, mutation_scale, rng):
+    """
+    Next generation from (fitness, genome) pairs sorted best first: the elite
+    are copied unchanged and the rest are children of two parents drawn from
+    the top half, with per-trait crossover and mutation.
+    """
+    genomes = [genome for _, genome in ranked]
+    survivors = genomes[:max(2, len(genomes) // 2)]
+    children = [dict(genome) for genome in genomes[:elite]]
+    while len(children) < size:
+        a, b = rng.sample(survivors, 2) if len(survivors) > 1 else survivors * 2
+        child = {}
+        for trait in a:
+            value = rng.choice([a[trait], b[trait]])
+            if rng.random() < mutation_rate:
+                value = min(max(value + rng.uniform(-mutation_scale, mutation_scale), 0), 1)
+            child[trait] = value
+        children.append(child)
+    return children
+
+
+def save_checkpoint(checkpoint_dir, generation, ranked, population, rng):
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    path = os.path.join(checkpoint_dir, f'generation_{generation:04d}.json')
+    state = {
+        'generation': generation,
+        'ranked': [{'fitness': fitness, 'genome': genome} for fitness, genome in ranked],
+        'population': population,
+        'rng_state': rng.getstate(),
+    }
+    with open(path + '.tmp', 'w') as f:
+        json.dump(state, f)
+    os.replace(path + '.tmp', path)
+
+
+def load_checkpoint(checkpoint_dir):
+    """Return the latest checkpoint in checkpoint_dir, or None."""
+    paths = sorted(glob.glob(os.path.join(checkpoint_dir, 'generation_*.json')))
+    if not paths:
+        return None
+    with open(paths[-1]) as f:
+        state = json.load(f)
+    version, internal, gauss = state['rng_state']
+    state['rng_state'] = (version, tuple(internal), gauss)
+    state['ranked'] = [(entry['fitness'], entry['genome']) for entry in state['ranked']]
+    return state
+
+
+def evolve(population_size=20, generations=10, elite=2, mutation_rate=0.2, mutation_scale=0.1,
+           seed=0, workers=None, checkpoint_dir=None, resume=False, **sim_kwargs):
+    """
+    Evolve civilization trait genomes by simulated fitness.
+    Each generation is evaluated with evaluate(genome, **sim_kwargs) on a
+    process pool of `workers` processes (workers=1 runs in this process), then
+    bred with a random.Random(seed) that is independent of the simulations,
+    so serial and parallel runs give identical results. With checkpoint_dir,
+    every generation's ranking, next population and RNG state is written
+    there, and resume=True continues from the latest one.
+    Returns the final generation as (fitness, genome) pairs, best first.
+    """
+    rng = random.Random(seed)
+    population = [random_genome(rng) for _ in range(population_size)]
+    ranked = []
+    start = 0
+    if resume and checkpoint_dir:
+        state = load_checkpoint(checkpoint_dir)
+        if state is not None:
+            start = state['generation'] + 1
+            ranked = state['ranked']
+            population = state['population']
+            rng.setstate(state['rng_state'])
+    fitness_of = partial(evaluate, **sim_kwargs)
+    executor = ProcessPoolExecutor(workers) if workers != 1 and start < generations else None
+    try:
+        for generation in range(start, generations):
+            if executor is None:
+                scores = list(map(fitness_of, population))
+            else:
+                scores = list(executor.map(fitness_of, population))
+            # Stable sort keeps population order among equal scores
+            ranked = sorted(zip(scores, population), key=lambda pair: -pair[0])
+            population = breed(ranked, population_size, elite, mutation_rate, mutation_scale, rng)
+            if checkpoint_dir:
+                save_checkpoint(checkpoint_dir, generation, ranked, population, rng)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return ranked
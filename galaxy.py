@@ -1,9 +1,18 @@
-import numpy as np
+import hashlib
+import json
+import os
 import random
+import shutil
+import tempfile
+import numpy as np
+from multiprocessing import shared_memory
+from scipy.spatial import cKDTree
+from agents import CivilizationTable, HistoryJournal
 
 class Star:
     """
     Represents a star in the galaxy.
+    Stars are lightweight views over the columnar arrays held by their Galaxy.
     Attributes:
         id: Unique identifier
         position: 3D coordinates
@@ -13,14 +22,36 @@ class Star:
         luminosity: Star luminosity (solar units)
         planets: List of Planet objects
     """
-    def __init__(self, id, position, star_type, metallicity, age):
+    __slots__ = ('galaxy', 'id')
+
+    def __init__(self, galaxy, id):
+        self.galaxy = galaxy
         self.id = id
-        self.position = position  # (x, y, z)
-        self.star_type = star_type
-        self.metallicity = metallicity
-        self.age = age
-        self.luminosity = self.estimate_luminosity()
-        self.planets = []
+
+    @property
+    def position(self):
+        return self.galaxy.star_positions[self.id]  # (x, y, z)
+
+    @property
+    def star_type(self):
+        return Galaxy.STAR_TYPES[self.galaxy.star_types[self.id]]
+
+    @property
+    def metallicity(self):
+        return float(self.galaxy.star_metallicity[self.id])
+
+    @property
+    def age(self):
+        return float(self.galaxy.star_age[self.id])
+
+    @property
+    def luminosity(self):
+        return float(self.galaxy.star_luminosity[self.id])
+
+    @property
+    def planets(self):
+        start, end = self.galaxy.star_planet_start[self.id:self.id + 2]
+        return [self.galaxy.planets[i] for i in range(start, end)]
 
     def estimate_luminosity(self):
         # Simple mapping by star type
@@ -30,6 +61,7 @@ class Star:
 class Planet:
     """
     Represents a planet orbiting a star.
+    Planets are lightweight views over the columnar arrays held by their Galaxy.
     Attributes:
         id: Unique identifier
         star: Parent Star object
@@ -46,80 +78,450 @@ class Planet:
         civilization: Civilization object if present
     """
     ATMOSPHERES = ['none', 'thin', 'Earth-like', 'thick', 'toxic']
-    def __init__(self, id, star, planet_type, mass, temperature, resources, habitable_zone):
+    __slots__ = ('galaxy', 'id')
+
+    def __init__(self, galaxy, id):
+        self.galaxy = galaxy
         self.id = id
-        self.star = star
-        self.planet_type = planet_type
-        self.mass = mass
-        self.temperature = temperature
-        self.resources = resources
-        self.habitable_zone = habitable_zone
-        self.orbital_radius = np.random.uniform(0.1, 30)  # AU
-        self.atmosphere = random.choice(self.ATMOSPHERES)
-        self.moons = np.random.poisson(1) if planet_type == 'rocky' else np.random.poisson(10)
-        self.has_life = False
-        self.has_intelligent_life = False
-        self.civilization = None
+
+    @property
+    def star(self):
+        return self.galaxy.stars[self.galaxy.planet_star[self.id]]
+
+    @property
+    def planet_type(self):
+        return Galaxy.PLANET_TYPES[self.galaxy.planet_types[self.id]]
+
+    @property
+    def mass(self):
+        return float(self.galaxy.planet_mass[self.id])
+
+    @property
+    def temperature(self):
+        return float(self.galaxy.planet_temperature[self.id])
+
+    @property
+    def resources(self):
+        return int(self.galaxy.planet_resources[self.id])
+
+    @resources.setter
+    def resources(self, value):
+        self.galaxy.planet_resources[self.id] = value
+
+    @property
+    def habitable_zone(self):
+        return bool(self.galaxy.planet_habitable[self.id])
+
+    @property
+    def orbital_radius(self):
+        return float(self.galaxy.planet_orbital_radius[self.id])  # AU
+
+    @property
+    def atmosphere(self):
+        return self.ATMOSPHERES[self.galaxy.planet_atmosphere[self.id]]
+
+    @property
+    def moons(self):
+        return int(self.galaxy.planet_moons[self.id])
+
+    @property
+    def has_life(self):
+        return bool(self.galaxy.planet_has_life[self.id])
+
+    @has_life.setter
+    def has_life(self, value):
+        self.galaxy.planet_has_life[self.id] = value
+
+    @property
+    def has_intelligent_life(self):
+        return bool(self.galaxy.planet_has_intelligent_life[self.id])
+
+    @has_intelligent_life.setter
+    def has_intelligent_life(self, value):
+        self.galaxy.planet_has_intelligent_life[self.id] = value
+
+    @property
+    def civilization(self):
+        return self.galaxy.civ_by_id.get(int(self.galaxy.planet_owner[self.id]))
+
+    @civilization.setter
+    def civilization(self, civ):
+        owned = int(self.galaxy.planet_owner[self.id] != -1)
+        if civ is None:
+            self.galaxy.planet_owner[self.id] = -1
+        else:
+            self.galaxy.civ_by_id[civ.id] = civ
+            self.galaxy.planet_owner[self.id] = civ.id
+        self.galaxy.planets_owned += int(civ is not None) - owned
+
+class LazyViews:
+    """
+    Read-only sequence of Star or Planet views.
+    Views are created on first access and cached, so the same index always
+    returns the same object.
+    """
+    def __init__(self, galaxy, view_cls, n):
+        self.galaxy = galaxy
+        self.view_cls = view_cls
+        self._items = [None] * n
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        item = self._items[index]
+        if item is None:
+            if index < 0:
+                index += len(self._items)
+            item = self.view_cls(self.galaxy, index)
+            self._items[index] = item
+        return item
+
+    def __iter__(self):
+        for i in range(len(self._items)):
+            yield self[i]
+
+    def __getstate__(self):
+        # Only the views created so far, so pickling stays small for large galaxies
+        return {'galaxy': self.galaxy, 'view_cls': self.view_cls, 'n': len(self._items),
+                'items': {i: item for i, item in enumerate(self._items) if item is not None}}
+
+    def __setstate__(self, state):
+        self.galaxy = state['galaxy']
+        self.view_cls = state['view_cls']
+        self._items = [None] * state['n']
+        for i, item in state['items'].items():
+            self._items[i] = item
+
+class GalaxyTemplate:
+    """
+    A galaxy's star and planet columns published in one
+    multiprocessing.shared_memory block. The template itself is small and
+    picklable; worker processes call Galaxy.attach(template) to get a galaxy
+    whose static columns are zero-copy read-only views of the block (the
+    small mutable planet columns are copied per galaxy). The creating
+    process must call unlink() (or use the template as a context manager)
+    once the workers are done.
+    """
+    def __init__(self, galaxy):
+        columns = [(name, np.asarray(getattr(galaxy, name))) for name in Galaxy.COLUMNS]
+        self.layout = []  # (column, dtype, shape, byte offset)
+        offset = 0
+        for name, array in columns:
+            offset = -(-offset // 64) * 64
+            self.layout.append((name, array.dtype.str, array.shape, offset))
+            offset += array.nbytes
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        self.name = self.shm.name
+        shared = self.arrays(writeable=True)
+        for name, array in columns:
+            shared[name][...] = array
+
+    def __getstate__(self):
+        return {'name': self.name, 'layout': self.layout, 'shm': None}
+
+    def arrays(self, writeable=False):
+        """Return the columns as arrays backed by the shared block."""
+        if self.shm is None:
+            self.shm = shared_memory.SharedMemory(name=self.name)
+        arrays = {}
+        for name, dtype, shape, offset in self.layout:
+            array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)
+            array.flags.writeable = writeable
+            arrays[name] = array
+        return arrays
+
+    def unlink(self):
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.unlink()
 
 class Galaxy:
     """
     Represents the galaxy, containing stars, planets, and civilizations.
     Handles procedural generation and seeding of life and civilizations.
+    Star and planet attributes are stored as NumPy columns (star_*, planet_*)
+    and generated in whole-array batches; `stars` and `planets` expose them
+    as per-object views.
     """
     STAR_TYPES = ['O', 'B', 'A', 'F', 'G', 'K', 'M']
+    STAR_TYPE_P = [0.01, 0.02, 0.06, 0.12, 0.2, 0.3, 0.29]
     PLANET_TYPES = ['rocky', 'gas_giant', 'ice', 'ocean', 'desert']
+    PLANET_TYPE_P = [0.5, 0.2, 0.1, 0.1, 0.1]
+    LUMINOSITY = np.array([100000, 20000, 80, 6, 1, 0.4, 0.04])
+    COLUMNS = ('star_positions', 'star_types', 'star_metallicity', 'star_age', 'star_luminosity',
+               'star_planet_start', 'planet_star', 'planet_types', 'planet_mass', 'planet_temperature',
+               'planet_resources', 'planet_habitable', 'planet_orbital_radius', 'planet_atmosphere',
+               'planet_moons', 'planet_has_life', 'planet_has_intelligent_life', 'planet_owner')
+    # Columns the simulation writes to; the rest never change after generation
+    MUTABLE_COLUMNS = ('planet_resources', 'planet_has_life', 'planet_has_intelligent_life', 'planet_owner')
+    # Bump whenever generation changes, so cached galaxies are not reused
+    GENERATOR_VERSION = 1
 
     def __init__(self, n_stars=1000, seed=42):
         np.random.seed(seed)
         random.seed(seed)
-        self.stars = []
-        self.planets = []
-        self.civilizations = []
+        self.reset_civilizations()
         self.generate_stars(n_stars)
         self.generate_planets()
         self.seed_life()
+        self.seed = seed
+        self.rng_state = (random.getstate(), np.random.get_state())
+
+    def reset_civilizations(self):
+        self.civilizations = []
+        self.civ_by_id = {}
+        self.civ_table = CivilizationTable()
+        self.journal = HistoryJournal()
+        self.planets_owned = 0
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """
+        Build a galaxy without civilizations from existing star and planet
+        columns (a dict keyed by COLUMNS). Read-only mutable columns are
+        copied, so this galaxy's changes stay private and every column is a
+        plain ndarray; the static columns are used as given.
+        """
+        galaxy = cls.__new__(cls)
+        galaxy.reset_civilizations()
+        for name in cls.COLUMNS:
+            array = arrays[name]
+            if name in cls.MUTABLE_COLUMNS and not array.flags.writeable:
+                array = np.array(array)
+            setattr(galaxy, name, array)
+        galaxy.stars = LazyViews(galaxy, Star, len(galaxy.star_types))
+        galaxy.planets = LazyViews(galaxy, Planet, len(galaxy.planet_star))
+        galaxy.planets_owned = int(np.count_nonzero(galaxy.planet_owner != -1))
+        galaxy._star_index = None
+        galaxy.seed = None
+        galaxy.rng_state = None
+        return galaxy
+
+    def save(self, path):
+        """
+        Write the star and planet columns to directory `path`, one .npy file
+        per column, with the seed and the post-generation RNG states in
+        meta.json. Civilizations are not saved.
+        """
+        os.makedirs(path, exist_ok=True)
+        for name in self.COLUMNS:
+            np.save(os.path.join(path, name + '.npy'), np.asarray(getattr(self, name)))
+        seed = None if self.seed is None else int(self.seed)
+        meta = {'n_stars': len(self.star_types), 'seed': seed, 'generator_version': self.GENERATOR_VERSION}
+        if self.rng_state is not None:
+            py_state, np_state = self.rng_state
+            meta['python_rng'] = [py_state[0], list(py_state[1]), py_state[2]]
+            meta['numpy_rng'] = [np_state[0], np_state[1].tolist(), *np_state[2:]]
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Load a galaxy written by save(). With mmap=True the static columns are
+        memory-mapped read-only, so only the pages that are touched get read;
+        the mutable columns are always loaded as private writable arrays.
+        """
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        arrays = {}
+        for name in cls.COLUMNS:
+            array = np.load(os.path.join(path, name + '.npy'), mmap_mode='r' if mmap else None)
+            arrays[name] = np.array(array) if name in cls.MUTABLE_COLUMNS else array
+        galaxy = cls.from_arrays(arrays)
+        galaxy.seed = meta['seed']
+        if 'python_rng' in meta:
+            version, internal, gauss = meta['python_rng']
+            kind, keys, pos, has_gauss, cached = meta['numpy_rng']
+            galaxy.rng_state = ((version, tuple(internal), gauss),
+                                (kind, np.array(keys, dtype=np.uint32), pos, has_gauss, cached))
+        return galaxy
+
+    @staticmethod
+    def cache_dir():
+        """Galaxy cache location: $GALAXY_CACHE_DIR, else ~/.cache/galactic-sim/galaxies."""
+        return os.environ.get('GALAXY_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'galactic-sim', 'galaxies')
+
+    @staticmethod
+    def cache_budget():
+        """Galaxy cache size limit in bytes: $GALAXY_CACHE_BYTES, else 2 GiB."""
+        return int(os.environ.get('GALAXY_CACHE_BYTES') or 2 * 2**30)
+
+    @classmethod
+    def cached(cls, n_stars=1000, seed=42, cache_dir=None, budget=None):
+        """
+        Galaxy(n_stars, seed) through an on-disk cache keyed by
+        (n_stars, seed, GENERATOR_VERSION). A hit is memory-mapped, and both
+        paths leave the global RNGs in the post-generation state, so what
+        follows is the same as with a freshly generated galaxy. New entries
+        are written to a temporary directory and renamed into place, after
+        which least recently used entries are evicted until the cache fits
+        in `budget` bytes (default cache_budget()). An unseeded galaxy
+        (seed=None) is random by design, so it bypasses the cache.
+        """
+        if seed is None:
+            return cls(n_stars, seed)
+        n_stars, seed = int(n_stars), int(seed)
+        cache_dir = cache_dir or cls.cache_dir()
+        key = json.dumps([n_stars, seed, cls.GENERATOR_VERSION])
+        path = os.path.join(cache_dir, hashlib.sha256(key.encode()).hexdigest()[:24])
+        meta = os.path.join(path, 'meta.json')
+        if os.path.exists(meta):
+            try:
+                galaxy = cls.load(path)
+                os.utime(meta)  # marks the entry as recently used
+            except OSError:
+                galaxy = None  # evicted by another process while loading
+            if galaxy is not None:
+                random.setstate(galaxy.rng_state[0])
+                np.random.set_state(galaxy.rng_state[1])
+                return galaxy
+        galaxy = cls(n_stars, seed)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp = tempfile.mkdtemp(dir=cache_dir, prefix='.tmp-')
+            galaxy.save(tmp)
+            try:
+                os.rename(tmp, path)
+            except OSError:
+                # Another process cached the same galaxy first
+                shutil.rmtree(tmp, ignore_errors=True)
+            cls.prune_cache(cache_dir, cls.cache_budget() if budget is None else budget, keep=path)
+        except OSError:
+            pass  # Caching is best-effort; the generated galaxy is still valid
+        return galaxy
+
+    @staticmethod
+    def prune_cache(cache_dir, budget, keep=None):
+        """
+        Delete cache entries, least recently used first, until the entries in
+        cache_dir take at most `budget` bytes. The entry at `keep` stays.
+        """
+        entries = []
+        for name in os.listdir(cache_dir):
+            path = os.path.join(cache_dir, name)
+            meta = os.path.join(path, 'meta.json')
+            if name.startswith('.') or not os.path.exists(meta):
+                continue
+            try:
+                size = sum(entry.stat().st_size for entry in os.scandir(path))
+                entries.append((os.path.getmtime(meta), size, path))
+            except OSError:
+                continue  # removed concurrently
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= budget:
+                break
+            if path != keep:
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+
+    def share(self):
+        """
+        Publish this galaxy's columns to shared memory and return the
+        GalaxyTemplate. Share before seeding civilizations; attached galaxies
+        start with none.
+        """
+        return GalaxyTemplate(self)
+
+    @classmethod
+    def attach(cls, template):
+        """Build a galaxy over a GalaxyTemplate's shared columns without copying them."""
+        galaxy = cls.from_arrays(template.arrays())
+        galaxy._template = template  # keeps the shared block mapped
+        return galaxy
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_star_index'] = None  # rebuilt on first use
+        return state
 
     def generate_stars(self, n_stars):
-        for i in range(n_stars):
-            position = np.random.uniform(-500, 500, 3)
-            star_type = np.random.choice(self.STAR_TYPES, p=[0.01, 0.02, 0.06, 0.12, 0.2, 0.3, 0.29])
-            metallicity = np.random.uniform(0.001, 0.03)
-            age = np.random.uniform(0.1, 13.0)
-            star = Star(i, position, star_type, metallicity, age)
-            self.stars.append(star)
+        self.star_positions = np.random.uniform(-500, 500, (n_stars, 3))
+        self.star_types = np.random.choice(len(self.STAR_TYPES), n_stars, p=self.STAR_TYPE_P).astype(np.uint8)
+        self.star_metallicity = np.random.uniform(0.001, 0.03, n_stars)
+        self.star_age = np.random.uniform(0.1, 13.0, n_stars)
+        self.star_luminosity = self.LUMINOSITY[self.star_types]
+        self.stars = LazyViews(self, Star, n_stars)
+        self._star_index = None
 
     def generate_planets(self):
-        planet_id = 0
-        for star in self.stars:
-            n_planets = np.random.poisson(3)
-            for _ in range(n_planets):
-                planet_type = np.random.choice(self.PLANET_TYPES, p=[0.5, 0.2, 0.1, 0.1, 0.1])
-                mass = np.random.uniform(0.1, 10)
-                temperature = np.random.uniform(50, 500)
-                resources = int(np.random.uniform(1e5, 1e8))
-                habitable_zone = 200 < temperature < 350 and planet_type == 'rocky'
-                planet = Planet(planet_id, star, planet_type, mass, temperature, resources, habitable_zone)
-                star.planets.append(planet)
-                self.planets.append(planet)
-                planet_id += 1
+        n_stars = len(self.star_types)
+        counts = np.random.poisson(3, n_stars)
+        # Planets are stored grouped by parent star; star i owns
+        # planet ids star_planet_start[i]:star_planet_start[i + 1].
+        self.star_planet_start = np.zeros(n_stars + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.star_planet_start[1:])
+        n_planets = int(self.star_planet_start[-1])
+        self.planet_star = np.repeat(np.arange(n_stars), counts)
+        self.planet_types = np.random.choice(len(self.PLANET_TYPES), n_planets, p=self.PLANET_TYPE_P).astype(np.uint8)
+        self.planet_mass = np.random.uniform(0.1, 10, n_planets)
+        self.planet_temperature = np.random.uniform(50, 500, n_planets)
+        self.planet_resources = np.random.uniform(1e5, 1e8, n_planets).astype(np.int64)
+        rocky = self.planet_types == self.PLANET_TYPES.index('rocky')
+        self.planet_habitable = (200 < self.planet_temperature) & (self.planet_temperature < 350) & rocky
+        self.planet_orbital_radius = np.random.uniform(0.1, 30, n_planets)
+        self.planet_atmosphere = np.random.randint(0, len(Planet.ATMOSPHERES), n_planets).astype(np.uint8)
+        self.planet_moons = np.random.poisson(np.where(rocky, 1, 10))
+        self.planet_has_life = np.zeros(n_planets, dtype=bool)
+        self.planet_has_intelligent_life = np.zeros(n_planets, dtype=bool)
+        self.planet_owner = np.full(n_planets, -1, dtype=np.int32)
+        self.planets = LazyViews(self, Planet, n_planets)
 
     def seed_life(self):
-        for planet in self.planets:
-            if planet.habitable_zone and planet.atmosphere == 'Earth-like':
-                p_life = 0.01 + 0.1 * planet.star.metallicity
-                if planet.star.star_type in ['G', 'K', 'M']:
-                    p_life += 0.05
-                if np.random.rand() < p_life:
-                    planet.has_life = True
-                    p_intel = 0.01 + 0.05 * planet.star.metallicity
-                    if np.random.rand() < p_intel:
-                        planet.has_intelligent_life = True
+        earth_like = self.planet_atmosphere == Planet.ATMOSPHERES.index('Earth-like')
+        candidates = np.flatnonzero(self.planet_habitable & earth_like)
+        stars = self.planet_star[candidates]
+        metallicity = self.star_metallicity[stars]
+        p_life = 0.01 + 0.1 * metallicity
+        p_life += 0.05 * np.isin(self.star_types[stars], [self.STAR_TYPES.index(t) for t in 'GKM'])
+        alive = np.random.rand(len(candidates)) < p_life
+        self.planet_has_life[candidates[alive]] = True
+        p_intel = 0.01 + 0.05 * metallicity[alive]
+        intelligent = np.random.rand(len(p_intel)) < p_intel
+        self.planet_has_intelligent_life[candidates[alive][intelligent]] = True
+
+    def add_civilization(self, civ):
+        """
+        Register a civilization with the galaxy and move its state into the
+        shared civ_table and journal. Row i of civ_table is civilizations[i].
+        """
+        civ.attach(self.civ_table, self.journal)
+        self.civilizations.append(civ)
+        self.civ_by_id[civ.id] = civ
+
+    @property
+    def star_index(self):
+        """KD-tree over star positions, built on first use. Stars never move."""
+        if self._star_index is None:
+            self._star_index = cKDTree(self.star_positions)
+        return self._star_index
+
+    def nearby_planet_ids(self, planet, max_distance=20, require_life=False):
+        """
+        Return ids of unowned planets whose star lies within max_distance of
+        planet's star, in ascending id order. Ownership and life are read from
+        the live planet columns, so the result reflects colonization and
+        sterilization without rebuilding the index.
+        """
+        origin = self.star_positions[self.planet_star[planet.id]]
+        # query_ball_point is inclusive; step just below max_distance to keep the strict bound
+        stars = np.sort(self.star_index.query_ball_point(origin, np.nextafter(max_distance, 0)))
+        starts = self.star_planet_start[stars]
+        counts = self.star_planet_start[stars + 1] - starts
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        ids = offsets + np.arange(offsets.size)
+        mask = (self.planet_owner[ids] == -1) & (ids != planet.id)
+        if require_life:
+            mask &= self.planet_has_life[ids]
+        return ids[mask]
 
     def get_nearby_planets(self, planet, max_distance=20):
-        result = []
-        for p in self.planets:
-            if p is not planet and p.civilization is None:
-                d = np.linalg.norm(planet.star.position - p.star.position)
-                if d < max_distance:
-                    result.append(p)
-        return result 
\ No newline at end of file
+        return [self.planets[i] for i in self.nearby_planet_ids(planet, max_distance)]
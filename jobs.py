@@ -0,0 +1,228 @@
+import multiprocessing
+import pickle
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from simulation import Simulation
+
+
+def run_job(config, steps, updates, cancel, interval=0.25):
+    """
+    Worker body: run Simulation(**config) for `steps` steps, putting
+    (step, stats batch) on `updates` at most every `interval` seconds, and
+    stop early once `cancel` is set. Returns the simulation.
+    """
+    sim = Simulation(**config)
+    pending = []
+    last = time.monotonic()
+    for batch in sim.stream(steps):
+        pending.append(batch)
+        now = time.monotonic()
+        if now - last >= interval or sim.current_step == steps or cancel.is_set():
+            updates.put((sim.current_step, pd.concat(pending, ignore_index=True)))
+            pending = []
+            last = now
+        if cancel.is_set():
+            break
+    return sim
+
+
+class Job:
+    """
+    Handle to a simulation running in a JobManager's pool.
+    poll() drains the worker's progress updates without blocking; the stats
+    received so far are in `partial`. A job may be watched by several
+    sessions at once: each one attach()es, and detach() cancels the run only
+    when the last of them leaves.
+    Attributes:
+        steps: Number of steps requested
+        step: Last step reported by the worker
+        partial: DataFrame of the stats rows received so far
+        sessions: Number of attached sessions
+    """
+    def __init__(self, future, updates, cancel_event, steps):
+        self.future = future
+        self.updates = updates
+        self.cancel_event = cancel_event
+        self.steps = steps
+        self.step = 0
+        self.partial = None
+        self.sessions = 0
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+
+    def poll(self):
+        # Sessions poll from their own script threads
+        with self.lock:
+            batches = [] if self.partial is None else [self.partial]
+            while True:
+                try:
+                    self.step, batch = self.updates.get_nowait()
+                except queue.Empty:
+                    break
+                batches.append(batch)
+            if batches:
+                self.partial = pd.concat(batches, ignore_index=True)
+            return self.step
+
+    @property
+    def progress(self):
+        return self.step / self.steps if self.steps else 1.0
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def status(self):
+        if self.future.cancelled():
+            return 'cancelled'
+        if not self.future.done():
+            return 'running' if self.future.running() else 'queued'
+        if self.future.exception() is not None:
+            return 'failed'
+        return 'cancelled' if self.cancel_event.is_set() else 'done'
+
+    def cancel(self):
+        """Stop the run; a running job finishes its current step and returns what it has."""
+        self.cancel_event.set()
+        self.future.cancel()
+
+    def attach(self):
+        with self.lock:
+            self.sessions += 1
+
+    def detach(self):
+        """Drop one attached session; the last one cancels the run. Returns True if it did."""
+        with self.lock:
+            self.sessions -= 1
+            last = self.sessions <= 0
+        if last:
+            self.cancel()
+        return last
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        """Return the finished (or cancelled mid-run) Simulation."""
+        sim = self.future.result(timeout)
+        self.poll()
+        return sim
+
+
+class JobManager:
+    """
+    Runs simulations in a pool of worker processes, so a run neither blocks
+    the caller nor shares its global RNGs with other runs. One manager can
+    be shared by every session of the Streamlit app.
+    """
+    def __init__(self, workers=2):
+        context = multiprocessing.get_context('spawn')
+        self.manager = context.Manager()
+        self.executor = ProcessPoolExecutor(workers, mp_context=context)
+
+    def submit(self, config, steps, interval=0.25):
+        """Start Simulation(**config).run(steps) in the pool and return its Job."""
+        updates = self.manager.Queue()
+        cancel = self.manager.Event()
+        future = self.executor.submit(run_job, config, steps, updates, cancel, interval)
+        return Job(future, updates, cancel, steps)
+
+    def shutdown(self):
+        self.executor.shutdown(cancel_futures=True)
+        self.manager.shutdown()
+
+
+class RunCache:
+    """
+    LRU cache of simulation runs keyed by their configuration, meant to be
+    shared by every session of the app. A key maps to its running Job while
+    the run is in flight, so identical requests share one run, and to the
+    finished Simulation afterwards. Finished runs are sized by their pickled
+    length and, with any derived data cached alongside them, evicted least
+    recently used first once the total exceeds `budget` bytes.
+    """
+    def __init__(self, jobs, budget=512 * 2**20):
+        self.jobs = jobs
+        self.budget = budget
+        self.entries = OrderedDict()  # key -> Job or Simulation
+        self.sizes = {}
+        self.derived_values = {}  # key -> {name: value}
+        self.lock = threading.Lock()
+
+    @property
+    def used(self):
+        return sum(self.sizes.values())
+
+    def get(self, key, config, steps):
+        """
+        Return the cached Simulation for key, the Job already computing it,
+        or a newly submitted Job. Failed and cancelled runs, including ones
+        still winding down after their last session detached, are resubmitted.
+        A returned Job has been attached for the caller, who detaches it to
+        stop watching.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if isinstance(entry, Job) and (entry.cancel_event.is_set() or entry.status in ('cancelled', 'failed')):
+                self._drop(key)
+                entry = None
+            if entry is None:
+                entry = self.jobs.submit(config, steps)
+                self.entries[key] = entry
+            self.entries.move_to_end(key)
+            if isinstance(entry, Job):
+                entry.attach()
+            return entry
+
+    def complete(self, key, job):
+        """
+        Return a finished job's Simulation and cache it unless it was
+        cancelled. A job that no longer owns its key (the key was resubmitted
+        or already holds a result) leaves the entry alone.
+        """
+        sim = job.result()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not job:
+                return entry if isinstance(entry, Simulation) else sim
+            if job.status == 'cancelled':
+                self._drop(key)
+                return sim
+            self.entries[key] = sim
+            self.sizes[key] = len(pickle.dumps(sim, protocol=5))
+            self._evict()
+            return sim
+
+    def derived(self, key, name, fn):
+        """Return fn() for a cached run, computing it once per run."""
+        with self.lock:
+            values = self.derived_values.get(key, {})
+            if name in values:
+                return values[name]
+        value = fn()
+        with self.lock:
+            if key in self.sizes:
+                self.derived_values.setdefault(key, {})[name] = value
+                self.sizes[key] += len(pickle.dumps(value, protocol=5))
+                self._evict()
+        return value
+
+    def _drop(self, key):
+        self.entries.pop(key, None)
+        self.sizes.pop(key, None)
+        self.derived_values.pop(key, None)
+
+    def _evict(self):
+        # Oldest finished runs go first; in-flight jobs are never evicted
+        for key in list(self.entries):
+            if self.used <= self.budget:
+                break
+            if key in self.sizes:
+                self._drop(key)
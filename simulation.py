@@ -1,12 +1,22 @@
+import io
+import os
+import pickle
 import numpy as np
 import random
+from scipy.spatial.distance import cdist
 from galaxy import Galaxy
 from agents import Civilization
+from events import EventManager
 from utils import distance
+from stats import PhaseTimer, StatsEngine
 
 class TechTree:
     """
     Represents a simple technology tree for civilizations.
+    Each technology is a bit position. A civ's research state is a row of
+    uint64 words in `masks` (indexed by civ id), and every technology has a
+    precomputed prerequisite mask, so availability for any number of civs is
+    one bitwise comparison.
     """
     def __init__(self):
         self.technologies = [
@@ -22,11 +32,51 @@ class TechTree:
             'Terraforming': ['Fusion Power'],
             'Dyson Spheres': ['Fusion Power', 'AI']
         }
+        self.bit = {tech: i for i, tech in enumerate(self.technologies)}
+        self.words = (len(self.technologies) + 63) // 64
+        self.tech_masks = np.stack([self.encode([tech]) for tech in self.technologies])
+        self.prereq_masks = np.stack([self.encode(self.prereqs.get(tech, [])) for tech in self.technologies])
+        self.masks = np.zeros((0, self.words), dtype=np.uint64)
+        self.registered = np.zeros(0, dtype=bool)
+
+    def encode(self, techs):
+        """Return the bitmask (one row of uint64 words) for a list of technologies."""
+        mask = np.zeros(self.words, dtype=np.uint64)
+        for tech in techs:
+            i = self.bit[tech]
+            mask[i // 64] |= np.uint64(1 << (i % 64))
+        return mask
+
+    def register(self, civ):
+        """Give the civ a mask row, initialised from its techs list."""
+        size = len(self.masks)
+        if civ.id >= size:
+            size = max(civ.id + 1, 2 * size)
+            self.masks = np.resize(self.masks, (size, self.words))
+            self.masks[len(self.registered):] = 0
+            self.registered = np.concatenate([self.registered, np.zeros(size - len(self.registered), dtype=bool)])
+        self.masks[civ.id] = self.encode(getattr(civ, 'techs', []))
+        self.registered[civ.id] = True
+
+    def research(self, civ, tech):
+        """Mark tech as researched by the civ."""
+        if civ.id >= len(self.registered) or not self.registered[civ.id]:
+            self.register(civ)
+        self.masks[civ.id] |= self.tech_masks[self.bit[tech]]
+        civ.techs.append(tech)
+
+    def available_matrix(self, ids):
+        """Boolean (len(ids), n_technologies) matrix of technologies each civ can research next."""
+        have = self.masks[ids][:, None, :]
+        owned = (have & self.tech_masks).any(axis=-1)
+        ready = ((have & self.prereq_masks) == self.prereq_masks).all(axis=-1)
+        return ready & ~owned
 
     def available(self, civ):
         """Return list of technologies available to research."""
-        owned = set(civ.techs)
-        return [tech for tech in self.technologies if tech not in owned and all(p in owned for p in self.prereqs.get(tech, []))]
+        if civ.id >= len(self.registered) or not self.registered[civ.id]:
+            self.register(civ)
+        return [self.technologies[i] for i in np.flatnonzero(self.available_matrix([civ.id])[0])]
 
 class TradeRoute:
     """
@@ -42,73 +92,297 @@ class TradeRoute:
 class Diplomacy:
     """
     Handles diplomatic relations between civilizations.
+    Relations are a square integer matrix indexed by civ id, so it grows when
+    a civilization with a new id first appears.
     """
-    def __init__(self, civs):
-        self.relations = {(a.id, b.id): 0 for a in civs for b in civs if a.id != b.id}
+    def __init__(self, civs=()):
+        self.matrix = np.zeros((0, 0), dtype=np.int32)
         # 0 = neutral, positive = friendly, negative = hostile
+        for civ in civs:
+            self.ensure(civ.id)
+
+    def ensure(self, civ_id):
+        """Grow the matrix (doubling) so that civ_id has a row and column."""
+        size = len(self.matrix)
+        if civ_id < size:
+            return
+        matrix = np.zeros((max(civ_id + 1, 2 * size),) * 2, dtype=self.matrix.dtype)
+        matrix[:size, :size] = self.matrix
+        self.matrix = matrix
 
     def update(self, civ1, civ2, delta):
-        key = (civ1.id, civ2.id)
-        if key in self.relations:
-            self.relations[key] += delta
+        if civ1.id != civ2.id:
+            self.ensure(max(civ1.id, civ2.id))
+            self.matrix[civ1.id, civ2.id] += delta
 
     def get(self, civ1, civ2):
-        return self.relations.get((civ1.id, civ2.id), 0)
+        if civ1.id < len(self.matrix) and civ2.id < len(self.matrix):
+            return int(self.matrix[civ1.id, civ2.id])
+        return 0
+
+    def drift(self, ids):
+        """Apply one random -1/0/+1 delta to every ordered pair of the given civ ids."""
+        if len(ids) < 2:
+            return
+        self.ensure(ids.max())
+        delta = np.random.randint(-1, 2, (len(ids), len(ids))).astype(self.matrix.dtype)
+        np.fill_diagonal(delta, 0)
+        self.matrix[np.ix_(ids, ids)] += delta
 
 class War:
     """
     Handles war between civilizations.
+    Active wars are keyed by (attacker id, defender id) with a per-civ index,
+    so membership and per-civ lookups are O(1). Every war is recorded with
+    the step it started and ended (-1 while ongoing); a war also ends when
+    either side collapses, see end_collapsed().
     """
     def __init__(self):
-        self.active_wars = []  # List of (civ1, civ2)
+        self.active = {}  # (id1, id2) -> (civ1, civ2, record index)
+        self.by_civ = {}  # civ id -> set of active keys involving it
+        self.attackers = []
+        self.defenders = []
+        self.start_steps = []
+        self.end_steps = []
+
+    @property
+    def active_wars(self):
+        return [(civ1, civ2) for civ1, civ2, _ in self.active.values()]
+
+    def is_active(self, civ1, civ2):
+        return (civ1.id, civ2.id) in self.active
+
+    def at_war(self, ids):
+        """Boolean mask of which civ ids are in an active war with a living opponent."""
+        def fighting(civ_id):
+            for key in self.by_civ.get(civ_id, ()):
+                civ1, civ2, _ = self.active[key]
+                if (civ2 if civ1.id == civ_id else civ1).status == 'alive':
+                    return True
+            return False
+        return np.array([fighting(i) for i in ids.tolist()], dtype=bool)
+
+    def wars_of(self, civ):
+        """Return the active (civ1, civ2) wars the civilization is part of."""
+        return [self.active[key][:2] for key in self.by_civ.get(civ.id, ())]
 
-    def declare(self, civ1, civ2):
-        self.active_wars.append((civ1, civ2))
-        civ1.history.append(f"Declared war on Civ {civ2.id}")
-        civ2.history.append(f"Was attacked by Civ {civ1.id}")
+    def declare(self, civ1, civ2, step=0):
+        key = (civ1.id, civ2.id)
+        self.active[key] = (civ1, civ2, len(self.start_steps))
+        self.by_civ.setdefault(civ1.id, set()).add(key)
+        self.by_civ.setdefault(civ2.id, set()).add(key)
+        self.attackers.append(civ1.id)
+        self.defenders.append(civ2.id)
+        self.start_steps.append(step)
+        self.end_steps.append(-1)
+        civ1.history.record('declared_war', civ2.id)
+        civ2.history.record('attacked_by', civ1.id)
 
-    def resolve(self, civ1, civ2):
+    def resolve(self, civ1, civ2, step=0):
         # Simple resolution: higher tech or population wins
         winner = civ1 if civ1.tech_level + civ1.population > civ2.tech_level + civ2.population else civ2
         loser = civ2 if winner is civ1 else civ1
         loser.collapse('defeated in war')
-        winner.history.append(f"Defeated Civ {loser.id} in war")
-        self.active_wars.remove((civ1, civ2))
+        winner.history.record('defeated', loser.id)
+        self.end(civ1, civ2, step)
+
+    def end(self, civ1, civ2, step=0):
+        """Remove an active war from the registry and record its end step."""
+        key = (civ1.id, civ2.id)
+        self.end_steps[self.active.pop(key)[2]] = step
+        self.by_civ[civ1.id].discard(key)
+        self.by_civ[civ2.id].discard(key)
+
+    def end_collapsed(self, step=0):
+        """End every active war in which either side is no longer alive."""
+        for civ1, civ2, _ in list(self.active.values()):
+            if civ1.status != 'alive' or civ2.status != 'alive':
+                self.end(civ1, civ2, step)
+
+    def resolve_batch(self, p, step=0):
+        """
+        End each war between two living civs with probability p, using a
+        single draw for all of them. Wars are resolved in declaration order;
+        one whose side already collapsed earlier in the pass is skipped.
+        """
+        wars = [(civ1, civ2) for civ1, civ2, _ in self.active.values()
+                if civ1.status == 'alive' and civ2.status == 'alive']
+        for i in np.flatnonzero(np.random.rand(len(wars)) < p):
+            civ1, civ2 = wars[i]
+            if civ1.status == 'alive' and civ2.status == 'alive':
+                self.resolve(civ1, civ2, step)
+
+    @property
+    def war_count(self):
+        return len(self.start_steps)
+
+    def durations(self):
+        """Return the length in steps of every war that has ended."""
+        start = np.array(self.start_steps, dtype=np.int64)
+        end = np.array(self.end_steps, dtype=np.int64)
+        return (end - start)[end >= 0]
 
 class CommunicationLag:
     """
     Models communication lag between civilizations (in years).
+    Keeps a civ-by-civ lag matrix indexed by civ id. It is rebuilt only when
+    the galaxy's civ table gains a civilization or a home planet changes.
     """
     def __init__(self, galaxy, c=1):
         self.galaxy = galaxy
         self.c = c  # speed of light in ly/year
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self._homes = None  # home_star column the matrix was built from
+
+    def refresh(self):
+        """Rebuild the lag matrix if civilizations or their homes changed."""
+        table = self.galaxy.civ_table
+        homes = table.home_star[:table.size]
+        if self._homes is not None and np.array_equal(homes, self._homes):
+            return
+        ids = table.ids[:table.size]
+        positions = self.galaxy.star_positions[homes]
+        self.matrix = np.full((ids.max() + 1 if len(ids) else 0,) * 2, np.inf, dtype=np.float32)
+        self.matrix[np.ix_(ids, ids)] = cdist(positions, positions) / self.c
+        self._homes = homes.copy()
 
     def lag(self, civ1, civ2):
+        if civ1.id in self.galaxy.civ_by_id and civ2.id in self.galaxy.civ_by_id:
+            self.refresh()
+            return float(self.matrix[civ1.id, civ2.id])
         pos1 = civ1.home_planet.star.position
         pos2 = civ2.home_planet.star.position
         return distance(pos1, pos2) / self.c
 
+    def within(self, ids, max_lag):
+        """Boolean matrix over ids: True where the pair's lag is below max_lag."""
+        self.refresh()
+        return self.matrix[np.ix_(ids, ids)] < max_lag
+
+    def partners_within(self, civ, max_lag, ids):
+        """Return the ids (a subset of ids, in order) within max_lag of civ, excluding civ."""
+        self.refresh()
+        ids = ids[ids != civ.id]
+        return ids[self.matrix[civ.id, ids] < max_lag]
+
+class Checkpoint:
+    """
+    Snapshot of a running Simulation, taken with Simulation.checkpoint().
+    Everything except the galaxy columns is pickled (protocol 5) together
+    with the Python and NumPy RNG states. Galaxy columns are kept out of the
+    pickle through persistent ids: static columns are shared by reference and
+    the mutable ones are copied once into read-only snapshots, which every
+    restore copies into private writable arrays. Restoring many times (fork)
+    therefore never copies the static columns.
+    Attributes:
+        state: Pickled simulation and RNG states
+        arrays: Galaxy columns by name
+    """
+    def __init__(self, state, arrays):
+        self.state = state
+        self.arrays = arrays
+
+    @classmethod
+    def capture(cls, sim):
+        galaxy = sim.galaxy
+        arrays, ids = {}, {}
+        for name in Galaxy.COLUMNS:
+            column = getattr(galaxy, name)
+            if name in Galaxy.MUTABLE_COLUMNS:
+                array = np.array(column)
+                array.flags.writeable = False
+            else:
+                array = column
+            arrays[name] = array
+            ids[id(column)] = name
+        buffer = io.BytesIO()
+        pickler = pickle.Pickler(buffer, protocol=5)
+        pickler.persistent_id = lambda obj: ids.get(id(obj))
+        pickler.dump((sim, random.getstate(), np.random.get_state()))
+        return cls(buffer.getvalue(), arrays)
+
+    def restore(self):
+        """
+        Return a new Simulation in the checkpointed state and set the global
+        RNGs to the checkpointed states, so running it continues exactly as
+        the original would have. The RNGs are global: run one restored
+        simulation at a time, restoring again before switching.
+        """
+        def load_column(name):
+            array = self.arrays[name]
+            return np.array(array) if name in Galaxy.MUTABLE_COLUMNS else array
+        unpickler = pickle.Unpickler(io.BytesIO(self.state))
+        unpickler.persistent_load = load_column
+        sim, py_state, np_state = unpickler.load()
+        random.setstate(py_state)
+        np.random.set_state(np_state)
+        return sim
+
+    def save(self, path):
+        """Write the checkpoint to directory `path` (state.pkl plus one .npy per column)."""
+        os.makedirs(path, exist_ok=True)
+        for name, array in self.arrays.items():
+            np.save(os.path.join(path, name + '.npy'), np.asarray(array))
+        with open(os.path.join(path, 'state.pkl'), 'wb') as f:
+            f.write(self.state)
+
+    @classmethod
+    def load(cls, path):
+        """Read a saved checkpoint; the columns are memory-mapped read-only."""
+        with open(os.path.join(path, 'state.pkl'), 'rb') as f:
+            state = f.read()
+        return cls(state, {name: np.load(os.path.join(path, name + '.npy'), mmap_mode='r')
+                           for name in Galaxy.COLUMNS})
+
 class Simulation:
     """
     Manages the simulation of the galaxy and civilizations.
     Handles seeding, time steps, and statistics.
     Now includes tech tree, trade, diplomacy, war, and communication lag.
+    With vectorized=True, step() updates all living civilizations' columns in
+    galaxy.civ_table at once instead of looping over Civilization objects.
+    A policy (ai.PopulationPolicy or ai.QLearningPolicy) makes the vectorized
+    step choose a strategy for every living civ; war sours and trade improves
+    its relations with all others.
+    An existing civilization-free galaxy (e.g. Galaxy.attach of a shared
+    template) can be passed instead of generating one; the RNGs are then
+    seeded with seed before civilizations are placed. Otherwise the galaxy
+    comes from Galaxy.cached unless galaxy_cache=False.
+    With events=True (or an EventManager) random events run at the end of
+    every step, before stats are recorded; the manager is `events`.
+    With profile=True a PhaseTimer (`timer`) records the wall time and calls
+    of every phase of every step.
     """
-    def __init__(self, n_stars=1000, n_civs=10, seed=42):
-        self.galaxy = Galaxy(n_stars=n_stars, seed=seed)
+    STRATEGY_RELATIONS = np.array([-1, 0, 1, 0])  # war, expand, trade, isolate
+
+    def __init__(self, n_stars=1000, n_civs=10, seed=42, vectorized=False, policy=None, galaxy=None,
+                 galaxy_cache=True, events=None, profile=False):
+        if galaxy is None:
+            galaxy = Galaxy.cached(n_stars, seed) if galaxy_cache else Galaxy(n_stars=n_stars, seed=seed)
+        else:
+            np.random.seed(seed)
+            random.seed(seed)
+        self.galaxy = galaxy
         self.n_civs = n_civs
         self.seed = seed
-        self.stats_history = []
+        self.vectorized = vectorized
+        self.policy = policy
+        self.current_step = 0
         self.tech_tree = TechTree()
         self.trade_routes = []
+        self.trade_volume = 0
         self.diplomacy = Diplomacy(self.galaxy.civilizations)
         self.war = War()
         self.comms = CommunicationLag(self.galaxy)
+        self.stats_engine = StatsEngine(self)
+        self.stats_history = self.stats_engine.history
         self.seed_civilizations()
+        self.events = EventManager(self.galaxy) if events is True else events or None
+        self.timer = PhaseTimer() if profile else None
 
     def seed_civilizations(self):
         civ_id = 0
-        candidates = [p for p in self.galaxy.planets if p.has_intelligent_life]
+        candidates = [self.galaxy.planets[i] for i in np.flatnonzero(self.galaxy.planet_has_intelligent_life)]
         random.shuffle(candidates)
         for planet in candidates[:self.n_civs]:
             traits = {
@@ -118,41 +392,162 @@ class Simulation:
             }
             civ = Civilization(civ_id, planet, traits)
             civ.techs = ['Agriculture']
+            self.tech_tree.register(civ)
+            self.galaxy.add_civilization(civ)
             planet.civilization = civ
-            self.galaxy.civilizations.append(civ)
             civ_id += 1
 
     def step(self):
+        if self.vectorized:
+            return self.step_vectorized()
+        timer = self.timer
+        if timer:
+            timer.begin()
         # Each civilization grows, expands, or collapses
         for civ in self.galaxy.civilizations:
             if civ.status == 'alive':
                 civ.grow()
+                if timer:
+                    timer.lap('grow')
                 civ.expand(self.galaxy)
+                if timer:
+                    timer.lap('expand')
                 self.handle_tech(civ)
+                if timer:
+                    timer.lap('tech')
                 self.handle_trade(civ)
+                if timer:
+                    timer.lap('trade')
                 self.handle_diplomacy(civ)
+                if timer:
+                    timer.lap('diplomacy')
                 self.handle_war(civ)
-        self.stats_history.append(self.stats())
+                if timer:
+                    timer.lap('war')
+        self.finish_step()
+
+    def step_vectorized(self):
+        # Same phases as step(), but each phase runs over all living civs
+        timer = self.timer
+        if timer:
+            timer.begin()
+        table = self.galaxy.civ_table
+        civs = self.galaxy.civilizations
+        for row in table.grow(table.alive_rows()):
+            civs[row].collapse('resource depletion')
+        self.war.end_collapsed(self.current_step)
+        if timer:
+            timer.lap('grow')
+        rows = table.alive_rows()
+        for row in rows:
+            civs[row].expand(self.galaxy)
+        if timer:
+            timer.lap('expand')
+        self.handle_policy_batch(rows)
+        if timer:
+            timer.lap('policy')
+        self.handle_tech_batch(rows)
+        if timer:
+            timer.lap('tech')
+        self.handle_trade_batch(rows)
+        if timer:
+            timer.lap('trade')
+        self.diplomacy.drift(table.ids[table.alive_rows()])
+        if timer:
+            timer.lap('diplomacy')
+        self.handle_war_batch(table.alive_rows())
+        if timer:
+            timer.lap('war')
+        self.finish_step()
+
+    def finish_step(self):
+        # Events and stats end every step, whichever way the civs were updated
+        timer = self.timer
+        self.handle_events()
+        # Wars whose side collapsed this step, for whatever reason, end now
+        self.war.end_collapsed(self.current_step)
+        if timer:
+            timer.lap('events')
+        self.stats_engine.record()
+        if timer:
+            timer.lap('stats')
+            timer.end()
+        self.current_step += 1
+
+    def handle_events(self):
+        if self.events is not None:
+            self.events.maybe_trigger_cosmic_event()
+            self.events.maybe_trigger_civilization_event()
+
+    def handle_policy_batch(self, rows):
+        # Every civ picks a strategy; its relations toward all others shift accordingly
+        if self.policy is None or len(rows) == 0:
+            return
+        table = self.galaxy.civ_table
+        ids = table.ids[rows]
+        choices = self.policy.choose_for(table, rows, self.war.at_war(ids))
+        self.diplomacy.ensure(ids.max())
+        delta = np.repeat(self.STRATEGY_RELATIONS[choices].astype(self.diplomacy.matrix.dtype)[:, None], len(ids), axis=1)
+        np.fill_diagonal(delta, 0)
+        self.diplomacy.matrix[np.ix_(ids, ids)] += delta
 
     def handle_tech(self, civ):
         # Research available tech if possible
         available = self.tech_tree.available(civ)
         if available and random.random() < 0.2:
             tech = random.choice(available)
-            civ.techs.append(tech)
+            self.tech_tree.research(civ, tech)
             civ.tech_level += 1
-            civ.history.append(f"Researched {tech}")
+            civ.history.record('researched', tech)
+
+    def handle_tech_batch(self, rows):
+        # One roll per civ, then each winner picks uniformly among its available techs
+        winners = rows[np.random.rand(len(rows)) < 0.2]
+        if len(winners) == 0:
+            return
+        civs = self.galaxy.civilizations
+        table = self.galaxy.civ_table
+        available = self.tech_tree.available_matrix(table.ids[winners])
+        counts = available.sum(axis=1)
+        picks = (np.random.rand(len(winners)) * counts).astype(np.int64)
+        choices = np.argmax(np.cumsum(available, axis=1) > picks[:, None], axis=1)
+        for row, tech, count in zip(winners, choices, counts):
+            if count:
+                civ = civs[row]
+                tech = self.tech_tree.technologies[tech]
+                self.tech_tree.research(civ, tech)
+                table.set_tech_level(row, table.tech_level[row] + 1)
+                civ.history.record('researched', tech)
 
     def handle_trade(self, civ):
         # Simple: trade with a random neighbor if friendly
-        for other in self.galaxy.civilizations:
-            if other is not civ and other.status == 'alive':
-                if self.diplomacy.get(civ, other) > 0 and self.comms.lag(civ, other) < 50:
-                    if random.random() < 0.05:
-                        route = TradeRoute(civ, other, 'resources', random.randint(100, 1000))
-                        self.trade_routes.append(route)
-                        civ.history.append(f"Started trade with Civ {other.id}")
-                        other.history.append(f"Started trade with Civ {civ.id}")
+        table = self.galaxy.civ_table
+        for other_id in self.comms.partners_within(civ, 50, table.ids[table.alive_rows()]):
+            other = self.galaxy.civ_by_id[other_id]
+            if self.diplomacy.get(civ, other) > 0:
+                if random.random() < 0.05:
+                    self.open_trade_route(civ, other, random.randint(100, 1000))
+
+    def handle_trade_batch(self, rows):
+        # Friendly pairs within lag 50 each open a route with probability 0.05
+        if len(rows) < 2:
+            return
+        civs = self.galaxy.civilizations
+        ids = self.galaxy.civ_table.ids[rows]
+        self.diplomacy.ensure(ids.max())
+        friendly = (self.diplomacy.matrix[np.ix_(ids, ids)] > 0) & self.comms.within(ids, 50)
+        np.fill_diagonal(friendly, False)
+        i, j = np.nonzero(friendly)
+        hits = np.random.rand(len(i)) < 0.05
+        volumes = np.random.randint(100, 1001, np.count_nonzero(hits))
+        for a, b, volume in zip(i[hits], j[hits], volumes):
+            self.open_trade_route(civs[rows[a]], civs[rows[b]], int(volume))
+
+    def open_trade_route(self, civ, other, volume):
+        self.trade_routes.append(TradeRoute(civ, other, 'resources', volume))
+        self.trade_volume += volume
+        civ.history.record('trade_started', other.id)
+        other.history.record('trade_started', civ.id)
 
     def handle_diplomacy(self, civ):
         # Randomly improve or worsen relations
@@ -165,20 +560,86 @@ class Simulation:
         # If relations are very bad, declare war
         for other in self.galaxy.civilizations:
             if other is not civ and other.status == 'alive':
-                if self.diplomacy.get(civ, other) < -5 and (civ, other) not in self.war.active_wars:
-                    self.war.declare(civ, other)
+                if self.diplomacy.get(civ, other) < -5 and not self.war.is_active(civ, other):
+                    self.war.declare(civ, other, self.current_step)
                 # Resolve war if active
-                if (civ, other) in self.war.active_wars:
+                if self.war.is_active(civ, other):
                     if random.random() < 0.1:
-                        self.war.resolve(civ, other)
+                        self.war.resolve(civ, other, self.current_step)
+
+    def handle_war_batch(self, rows):
+        # Declare war on every hostile pair not already at war, then one resolution pass
+        if len(rows) == 0:
+            return
+        civs = self.galaxy.civilizations
+        ids = self.galaxy.civ_table.ids[rows]
+        self.diplomacy.ensure(ids.max())
+        hostile = self.diplomacy.matrix[np.ix_(ids, ids)] < -5
+        for i, j in zip(*np.nonzero(hostile)):
+            civ, other = civs[rows[i]], civs[rows[j]]
+            if not self.war.is_active(civ, other):
+                self.war.declare(civ, other, self.current_step)
+        self.war.resolve_batch(0.1, self.current_step)
 
     def run(self, steps=100):
         for t in range(steps):
             self.step()
         return self.stats_history
 
+    def stream(self, steps=None, batch_size=1, sinks=(), keep=None):
+        """
+        Run the simulation and yield each batch of batch_size steps' stats as
+        a DataFrame as soon as it is complete; steps=None runs until the
+        caller stops iterating. Every batch is also written to each sink
+        (stats.CsvStatsSink, NdjsonStatsSink, NpyChunkSink or anything with
+        write(frame) and close()), and the sinks are closed when the stream
+        ends. With keep, stats_history is truncated to its last `keep` rows
+        after every batch, so memory stays bounded however long the run.
+        """
+        history = self.stats_history
+        done = 0
+        try:
+            while steps is None or done < steps:
+                n = batch_size if steps is None else min(batch_size, steps - done)
+                start = len(history)
+                for _ in range(n):
+                    self.step()
+                done += n
+                batch = history.frame(start)
+                for sink in sinks:
+                    sink.write(batch)
+                if keep is not None:
+                    history.truncate(keep)
+                yield batch
+        finally:
+            for sink in sinks:
+                sink.close()
+
+    def checkpoint(self, path=None):
+        """
+        Snapshot the full simulation state and RNG states as a Checkpoint,
+        also written to directory `path` if given. Custom stats metrics must
+        be picklable (named functions, not lambdas).
+        """
+        checkpoint = Checkpoint.capture(self)
+        if path is not None:
+            checkpoint.save(path)
+        return checkpoint
+
+    @staticmethod
+    def restore(checkpoint):
+        """Return the Simulation saved in a Checkpoint or checkpoint directory."""
+        if not isinstance(checkpoint, Checkpoint):
+            checkpoint = Checkpoint.load(checkpoint)
+        return checkpoint.restore()
+
+    def fork(self):
+        """
+        Return an independent copy of this simulation at the current step.
+        The copy shares the galaxy's static columns and snapshots of the
+        mutable ones; the global RNGs are left where they are.
+        """
+        return self.checkpoint().restore()
+
     def stats(self):
-        alive = sum(1 for c in self.galaxy.civilizations if c.status == 'alive')
-        total_pop = sum(c.population for c in self.galaxy.civilizations if c.status == 'alive')
-        avg_tech = np.mean([c.tech_level for c in self.galaxy.civilizations if c.status == 'alive']) if alive else 0
-        return {'alive_civs': alive, 'total_population': total_pop, 'avg_tech': avg_tech} 
\ No newline at end of file
+        return self.stats_engine.sample()
@@ -0,0 +1,284 @@
+import glob
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+
+
+class StatsHistory:
+    """
+    Per-step statistics stored as one preallocated float64 block.
+    Rows are steps and columns are metrics; capacity doubles as rows are
+    appended. Indexing or iterating yields one dict per step, as the old
+    list-of-dicts history did, and to_frame() returns a DataFrame that shares
+    the block instead of copying it.
+    """
+    def __init__(self, columns, integer=(), capacity=256):
+        self.columns = list(columns)
+        self.integer = set(integer)
+        self.data = np.zeros((capacity, len(self.columns)))
+        self.size = 0
+
+    def add_column(self, name, integer=False):
+        """Add a metric column; earlier rows read 0."""
+        self.columns.append(name)
+        if integer:
+            self.integer.add(name)
+        self.data = np.hstack([self.data, np.zeros((len(self.data), 1))])
+
+    def append(self, row):
+        if self.size == len(self.data):
+            data = np.zeros((2 * len(self.data), len(self.columns)))
+            data[:self.size] = self.data[:self.size]
+            self.data = data
+        self.data[self.size] = [row.get(name, 0) for name in self.columns]
+        self.size += 1
+
+    def column(self, name):
+        """Return a view of one metric over all recorded steps."""
+        return self.data[:self.size, self.columns.index(name)]
+
+    def to_frame(self):
+        return pd.DataFrame(self.data[:self.size], columns=self.columns, copy=False)
+
+    def frame(self, start=0, stop=None):
+        """Copy of rows start:stop as a DataFrame, with integer metrics as int64."""
+        frame = pd.DataFrame(self.data[start:self.size if stop is None else stop], columns=self.columns)
+        for name in self.columns:
+            if name in self.integer:
+                frame[name] = frame[name].astype(np.int64)
+        return frame
+
+    def truncate(self, keep=0):
+        """Drop all but the last `keep` rows, e.g. after they were streamed to a sink."""
+        keep = min(keep, self.size)
+        self.data[:keep] = self.data[self.size - keep:self.size]
+        self.size = keep
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.size))]
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError('stats history index out of range')
+        return {name: int(value) if name in self.integer else float(value)
+                for name, value in zip(self.columns, self.data[index])}
+
+    def __iter__(self):
+        for i in range(self.size):
+            yield self[i]
+
+
+class PhaseTimer:
+    """
+    Wall time and call counts of each simulation phase at every step.
+    Both live in preallocated (steps, phases) arrays that double when full.
+    begin() starts a step, lap(phase) charges the time since the previous lap
+    to that phase and counts one call, and end() closes the step.
+    """
+    PHASES = ('grow', 'expand', 'policy', 'tech', 'trade', 'diplomacy', 'war', 'events', 'stats')
+
+    def __init__(self, capacity=1024):
+        self.index = {phase: i for i, phase in enumerate(self.PHASES)}
+        self.times = np.zeros((capacity, len(self.PHASES)))
+        self.calls = np.zeros((capacity, len(self.PHASES)), dtype=np.int64)
+        self.size = 0
+        self.last = 0.0
+
+    def begin(self):
+        if self.size == len(self.times):
+            self.times = np.vstack([self.times, np.zeros_like(self.times)])
+            self.calls = np.vstack([self.calls, np.zeros_like(self.calls)])
+        self.last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        i = self.index[phase]
+        self.times[self.size, i] += now - self.last
+        self.calls[self.size, i] += 1
+        self.last = now
+
+    def end(self):
+        self.size += 1
+
+    def to_frame(self):
+        """Seconds spent in each phase (columns) at each step (rows)."""
+        frame = pd.DataFrame(self.times[:self.size], columns=self.PHASES)
+        frame.index.name = 'step'
+        return frame
+
+    def summary(self):
+        """Total and mean seconds per step, calls and share of step time for each phase."""
+        times = self.times[:self.size]
+        total = times.sum(axis=0)
+        return pd.DataFrame({
+            'total_s': total,
+            'mean_ms': 1000 * total / max(self.size, 1),
+            'max_ms': 1000 * times.max(axis=0) if self.size else np.zeros(len(self.PHASES)),
+            'calls': self.calls[:self.size].sum(axis=0),
+            'share': total / total.sum() if total.sum() else np.zeros(len(self.PHASES)),
+        }, index=pd.Index(self.PHASES, name='phase'))
+
+
+class CsvStatsSink:
+    """Appends streamed stats batches to a CSV file, writing the header once."""
+    def __init__(self, path):
+        self.path = path
+        self.header = True
+
+    def write(self, frame):
+        frame.to_csv(self.path, mode='w' if self.header else 'a', header=self.header, index=False)
+        self.header = False
+
+    def close(self):
+        pass
+
+
+class NdjsonStatsSink:
+    """Appends streamed stats batches to a file as one JSON object per step."""
+    def __init__(self, path):
+        self.file = open(path, 'w')
+
+    def write(self, frame):
+        frame.to_json(self.file, orient='records', lines=True, double_precision=15)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class NpyChunkSink:
+    """
+    Stores streamed stats as a directory of float64 .npy chunks of up to
+    chunk_rows steps each, plus columns.json. At most one chunk is held in
+    memory. chunks() reads the chunks back lazily as memory-mapped arrays,
+    and load() builds a DataFrame of just the rows asked for.
+    """
+    def __init__(self, path, chunk_rows=65536):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.chunks = 0
+        self.buffer = None
+        self.size = 0
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, frame):
+        if self.buffer is None:
+            self.buffer = np.zeros((self.chunk_rows, frame.shape[1]))
+            with open(os.path.join(self.path, 'columns.json'), 'w') as f:
+                json.dump(list(frame.columns), f)
+        values = frame.to_numpy(dtype=float)
+        while len(values):
+            n = min(len(values), self.chunk_rows - self.size)
+            self.buffer[self.size:self.size + n] = values[:n]
+            self.size += n
+            values = values[n:]
+            if self.size == self.chunk_rows:
+                self.flush()
+
+    def flush(self):
+        if self.size:
+            np.save(os.path.join(self.path, f'chunk_{self.chunks:06d}.npy'), self.buffer[:self.size])
+            self.chunks += 1
+            self.size = 0
+
+    def close(self):
+        self.flush()
+
+    @staticmethod
+    def columns(path):
+        with open(os.path.join(path, 'columns.json')) as f:
+            return json.load(f)
+
+    @staticmethod
+    def chunks(path):
+        """Yield the stored chunks in order as read-only memory-mapped (rows, metrics) arrays."""
+        for chunk in sorted(glob.glob(os.path.join(path, 'chunk_*.npy'))):
+            yield np.load(chunk, mmap_mode='r')
+
+    @staticmethod
+    def load(path, start=0, stop=None):
+        """
+        DataFrame of stored rows [start, stop). Only the chunks overlapping
+        the range are read, and only the requested rows are copied.
+        """
+        columns = NpyChunkSink.columns(path)
+        parts = []
+        offset = 0
+        for chunk in NpyChunkSink.chunks(path):
+            end = offset + len(chunk)
+            if stop is not None and offset >= stop:
+                break
+            if end > start:
+                parts.append(chunk[max(start - offset, 0):len(chunk) if stop is None else stop - offset])
+            offset = end
+        data = np.concatenate(parts) if parts else np.zeros((0, len(columns)))
+        return pd.DataFrame(data, columns=columns)
+
+
+class StatsEngine:
+    """
+    Computes and records per-step statistics for a Simulation.
+    Built-in metrics read running aggregates kept by the civ table, galaxy,
+    war registry and trade routes, so sampling does not walk the
+    civilizations. Extra metrics are added with register().
+    """
+    def __init__(self, sim):
+        self.sim = sim
+        self.metrics = {}
+        self.history = StatsHistory(['step'], integer=['step'])
+        self._wars_recorded = 0
+        # Built-ins are named functions rather than lambdas so the engine can be pickled
+        self.register('alive_civs', self.alive_civs, integer=True)
+        self.register('total_population', self.total_population, integer=True)
+        self.register('avg_tech', self.avg_tech)
+        self.register('war_count', self.war_count, integer=True)
+        self.register('trade_volume', self.trade_volume, integer=True)
+        self.register('planets_owned', self.planets_owned, integer=True)
+
+    @staticmethod
+    def alive_civs(sim):
+        return sim.galaxy.civ_table.alive_count
+
+    @staticmethod
+    def total_population(sim):
+        return sim.galaxy.civ_table.alive_population
+
+    @staticmethod
+    def avg_tech(sim):
+        table = sim.galaxy.civ_table
+        return table.alive_tech / table.alive_count if table.alive_count else 0
+
+    def war_count(self, sim):
+        # Wars declared since the last recorded step
+        return sim.war.war_count - self._wars_recorded
+
+    @staticmethod
+    def trade_volume(sim):
+        return sim.trade_volume
+
+    @staticmethod
+    def planets_owned(sim):
+        return sim.galaxy.planets_owned
+
+    def register(self, name, fn, integer=False):
+        """Add a metric computed as fn(sim) at every step."""
+        self.metrics[name] = fn
+        self.history.add_column(name, integer)
+
+    def sample(self):
+        """Return the current value of every metric."""
+        return {name: fn(self.sim) for name, fn in self.metrics.items()}
+
+    def record(self):
+        """Append the current step's metrics to the history and return them."""
+        row = self.sample()
+        row['step'] = self.sim.current_step
+        self.history.append(row)
+        self._wars_recorded = self.sim.war.war_count
+        return row
@@ -9,9 +9,9 @@ import plotly
 import matplotlib.pyplot as plt
 from datetime import datetime
 from simulation import Simulation, TechTree
-from visualization import plot_galaxy_3d, plot_civilization_stats, plot_trade_network, plot_civilization_history, plot_resource_heatmap, plot_tech_tree
+from visualization import plot_galaxy_3d, plot_civilization_stats, plot_trade_network, plot_civilization_history, plot_resource_heatmap, plot_tech_tree, planet_resource_points, star_lod, owned_systems, civilization_frame
 from events import EventManager
-from utils import format_event_log
+from jobs import JobManager, RunCache
 
 # Set page configuration
 st.set_page_config(
@@ -113,6 +113,10 @@ with st.sidebar:
         run_button = st.button("🚀 Run Simulation", use_container_width=True, type="primary")
     with col2:
         if st.button("🔄 Reset", use_container_width=True):
+            if st.session_state.get('job') is not None:
+                # Other sessions may be watching the same run; only the last one cancels it
+                st.session_state['job'].detach()
+                st.session_state['job'] = None
             if 'sim' in st.session_state:
                 del st.session_state['sim']
             if 'event_manager' in st.session_state:
@@ -135,90 +139,289 @@ if 'sim' not in st.session_state or st.sidebar.button("Reset Simulation"):
     st.session_state['event_manager'] = None
     st.session_state['stats_history'] = None
 
+@st.cache_resource
+def get_run_cache():
+    """Worker pool and run cache shared by every browser session."""
+    return RunCache(JobManager(workers=2), budget=512 * 2**20)
+
+def show_results(sim, cancelled, cached=False):
+    """Hand a finished simulation to the dashboard."""
+    st.session_state['sim'] = sim
+    st.session_state['event_manager'] = sim.events or EventManager(sim.galaxy)
+    st.session_state['stats_history'] = sim.stats_history
+    st.session_state['end_time'] = datetime.now()
+    st.session_state['cancelled'] = cancelled
+    st.session_state['finished'] = True
+    st.session_state['cached'] = cached
+
 if run_button:
-    try:
-        # Initialize session state for new simulation
-        st.session_state['sim'] = None
-        st.session_state['event_manager'] = None
-        st.session_state['stats_history'] = None
-        st.session_state['start_time'] = datetime.now()
-        
-        # Clear any previous output
-        st.empty()
-        
-        # Create a status container and progress bar
-        status_container = st.empty()
-        progress_bar = st.progress(0)
-        status_text = status_container.info("Initializing simulation...")
-        
-        # Scenario presets
-        if scenario == "Crowded Galaxy":
-            n_stars, n_civs = 2000, 40
-        elif scenario == "Sparse Life":
-            n_stars, n_civs = 2000, 2
-        elif scenario == "Warzone":
-            n_stars, n_civs = 1000, 20
-        elif scenario == "Peaceful Era":
-            n_stars, n_civs = 1000, 10
-        
-        # Initialize simulation
-        status_text.info("Generating galaxy...")
-        sim = Simulation(n_stars=n_stars, n_civs=n_civs, seed=seed)
-        event_manager = EventManager(sim.galaxy)
-        stats_history = []
-        
-        # Run simulation steps
-        status_text.info("Running simulation...")
-        for t in range(steps):
-            # Update progress
-            progress = (t + 1) / steps
-            progress_bar.progress(progress)
-            status_text.info(f"Step {t+1}/{steps} ({(t+1)*1000} years simulated)")
-            
-            # Run simulation step
-            sim.step()
-            
-            # Trigger random events if enabled
-            if events_enabled:
-                event_manager.maybe_trigger_cosmic_event()
-                event_manager.maybe_trigger_civilization_event()
-            
-            # Record statistics
-            stats = sim.stats()
-            stats['step'] = t
-            stats_history.append(stats)
-            
-            # Update session state periodically for better responsiveness
-            if t % 10 == 0 or t == steps - 1:
-                st.session_state['sim'] = sim
-                st.session_state['event_manager'] = event_manager
-                st.session_state['stats_history'] = stats_history
-        
-        # Store final state
-        st.session_state['sim'] = sim
-        st.session_state['event_manager'] = event_manager
-        st.session_state['stats_history'] = stats_history
-        st.session_state['end_time'] = datetime.now()
-        
-        # Show completion message
-        duration = (st.session_state['end_time'] - st.session_state['start_time']).seconds
-        status_container.success(f"✅ Simulation completed in {duration} seconds!")
-        progress_bar.empty()
+    # Scenario presets
+    if scenario == "Crowded Galaxy":
+        n_stars, n_civs = 2000, 40
+    elif scenario == "Sparse Life":
+        n_stars, n_civs = 2000, 2
+    elif scenario == "Warzone":
+        n_stars, n_civs = 1000, 20
+    elif scenario == "Peaceful Era":
+        n_stars, n_civs = 1000, 10
+    
+    # Reuse a cached or in-flight identical run; otherwise start one in the background
+    st.session_state['sim'] = None
+    st.session_state['event_manager'] = None
+    st.session_state['stats_history'] = None
+    st.session_state.pop('end_time', None)
+    st.session_state['start_time'] = datetime.now()
+    run_key = (scenario, n_stars, n_civs, int(seed), steps, events_enabled)
+    config = dict(n_stars=n_stars, n_civs=n_civs, seed=int(seed), events=events_enabled, profile=True)
+    entry = get_run_cache().get(run_key, config, steps)
+    if st.session_state.get('job') is not None:
+        st.session_state['job'].detach()
+    st.session_state['run_key'] = run_key
+    if isinstance(entry, Simulation):
+        st.session_state['job'] = None
+        show_results(entry, cancelled=False, cached=True)
+    else:
+        st.session_state['job'] = entry
+
+@st.fragment(run_every=0.25)
+def show_job_progress():
+    """Poll the running job; hand its simulation to the dashboard once it finishes."""
+    job = st.session_state.get('job')
+    if job is None:
+        return
+    job.poll()
+    if job.done():
+        st.session_state['job'] = None
+        try:
+            sim = get_run_cache().complete(st.session_state['run_key'], job)
+        except Exception as e:
+            st.error(f"❌ Error during simulation: {str(e)}")
+            st.exception(e)  # Show full traceback in the app
+            return
+        show_results(sim, cancelled=job.status == 'cancelled')
+        st.rerun(scope="app")
+    
+    status = "Waiting for a worker..." if job.status == 'queued' else \
+        f"Step {job.step}/{job.steps} ({job.step*1000} years simulated)"
+    st.info(f"⏳ {status}")
+    st.progress(job.progress)
+    if job.partial is not None and len(job.partial):
+        col1, col2 = st.columns(2)
+        with col1:
+            st.line_chart(job.partial, x='step', y='total_population', height=200)
+        with col2:
+            st.line_chart(job.partial, x='step', y='alive_civs', height=200)
+    if st.button("⏹ Cancel Simulation"):
+        if not job.detach():
+            # Other sessions are still watching this run; just stop following it
+            st.session_state['job'] = None
+            st.session_state['sim'] = None
+            st.session_state['stopped_following'] = True
+            st.rerun(scope="app")
+
+if st.session_state.get('job') is not None:
+    show_job_progress()
+elif st.session_state.pop('stopped_following', False):
+    st.info("⏹ Stopped following the simulation; it keeps running for the other sessions watching it.")
+elif st.session_state.pop('finished', False):
+    # Show completion message once, on the rerun that picked up the result
+    duration = (st.session_state['end_time'] - st.session_state['start_time']).seconds
+    if st.session_state.get('cached'):
+        st.success("✅ Loaded identical simulation from the cache.")
+    elif st.session_state.get('cancelled'):
+        st.warning(f"⏹ Simulation cancelled after {len(st.session_state['stats_history'])} steps.")
+    else:
+        st.success(f"✅ Simulation completed in {duration} seconds!")
         st.balloons()
-        
-    except Exception as e:
-        status_container.error(f"❌ Error during simulation: {str(e)}")
-        st.exception(e)  # Show full traceback in the app
-        if 'sim' in st.session_state:
-            del st.session_state['sim']
-        if 'event_manager' in st.session_state:
-            del st.session_state['event_manager']
-        if 'stats_history' in st.session_state:
-            del st.session_state['stats_history']
+
+
+MAP_POINT_BUDGET = 20000
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def galaxy_star_lod(n_stars, seed, budget, _positions):
+    """Star LOD points for the map, computed once per generated galaxy."""
+    return star_lod(_positions, budget)
+
+def build_galaxy_map(sim, budget=MAP_POINT_BUDGET):
+    """
+    3D galaxy map figure; built once per run and kept in the run cache.
+    Stars are drawn through star_lod, so at most `budget` star points reach
+    the browser; colonized systems and civilization homes are always drawn.
+    """
+    galaxy = sim.galaxy
+    if galaxy.seed is None:
+        points, counts = star_lod(galaxy.star_positions, budget)
+    else:
+        points, counts = galaxy_star_lod(len(galaxy.star_positions), galaxy.seed, budget,
+                                         galaxy.star_positions)
+    aggregated = len(points) < len(galaxy.star_positions)
+
+    # Create 3D scatter plot for stars
+    fig = go.Figure()
+
+    # Add stars; aggregated voxels grow with the number of stars they hold
+    fig.add_trace(go.Scatter3d(
+        x=points[:, 0],
+        y=points[:, 1],
+        z=points[:, 2],
+        mode='markers',
+        marker=dict(
+            size=2 + np.log2(counts) if aggregated else 2,
+            color='yellow',
+            opacity=0.5,
+            sizemode='diameter'
+        ),
+        customdata=counts,
+        name=f'Stars ({len(points):,} of {len(galaxy.star_positions):,} points)' if aggregated else 'Stars',
+        hovertemplate='%{customdata:,} stars<extra></extra>' if aggregated else None,
+        hoverinfo=None if aggregated else 'none'
+    ))
+
+    # Colonized systems are never aggregated away
+    stars, owners = owned_systems(galaxy)
+    if len(stars):
+        positions = galaxy.star_positions[stars]
+        fig.add_trace(go.Scatter3d(
+            x=positions[:, 0],
+            y=positions[:, 1],
+            z=positions[:, 2],
+            mode='markers',
+            marker=dict(size=3, color=owners, colorscale='Turbo', opacity=0.8),
+            customdata=np.column_stack([stars, owners]),
+            hovertemplate='System %{customdata[0]}<br>Owner: Civ %{customdata[1]}<extra></extra>',
+            name='Colonized Systems'
+        ))
+
+    # Add civilizations if any exist
+    table = galaxy.civ_table
+    rows = table.alive_rows()
+    if len(rows):
+        positions = galaxy.star_positions[table.home_star[rows]]
+        fig.add_trace(go.Scatter3d(
+            x=positions[:, 0],
+            y=positions[:, 1],
+            z=positions[:, 2],
+            mode='markers+text',
+            marker=dict(
+                size=8,
+                color='red',
+                symbol='diamond',
+                line=dict(width=1, color='white')
+            ),
+            text=np.char.add('Civ ', table.ids[rows].astype(str)),
+            textposition='top center',
+            customdata=np.column_stack([table.population[rows], table.tech_level[rows]]),
+            hovertemplate=(
+                "<b>%{text}</b><br>"
+                "Status: Alive<br>"
+                "Population: %{customdata[0]:,}<br>"
+                "Tech Level: %{customdata[1]:.1f}<extra></extra>"
+            ),
+            name='Civilizations'
+        ))
+
+    # Update layout for better visualization
+    fig.update_layout(
+        scene=dict(
+            xaxis_title='X (light years)',
+            yaxis_title='Y (light years)',
+            zaxis_title='Z (light years)',
+            aspectmode='auto',
+            camera=dict(
+                eye=dict(x=1.5, y=1.5, z=1.5)
+            ),
+            xaxis=dict(showbackground=False),
+            yaxis=dict(showbackground=False),
+            zaxis=dict(showbackground=False)
+        ),
+        margin=dict(l=0, r=0, b=0, t=30),
+        height=700,
+        legend=dict(
+            yanchor='top',
+            y=0.99,
+            xanchor='left',
+            x=0.01
+        )
+    )
+    return fig
+
+def build_resource_map(sim, three_d=True):
+    """
+    Planet resource scatter as a single trace built from the planet columns:
+    marker size and color follow resources, and hover text is formatted in
+    the browser from per-point customdata.
+    """
+    points = planet_resource_points(sim.galaxy)
+    resources = points['resources'].to_numpy()
+    span = max(resources.max() - resources.min(), 1) if len(resources) else 1
+    sizes = 3 + 9 * (resources - (resources.min() if len(resources) else 0)) / span
+    owner = points['owner'].to_numpy()
+    customdata = np.column_stack([
+        points['planet'].to_numpy(),
+        points['planet_type'].to_numpy(),
+        resources / 1e6,
+        np.where(owner >= 0, np.char.add('Civ ', owner.astype(str)), 'none'),
+    ])
+    marker = dict(
+        size=sizes if three_d else sizes * 1.5,
+        color=resources / 1e6,  # Color by resource content
+        colorscale='Viridis',
+        opacity=0.8,
+        colorbar=dict(title='Resources (M)'),
+        showscale=True
+    )
+    position = "(%{x:.1f}, %{y:.1f}, %{z:.1f})" if three_d else "(%{x:.1f}, %{y:.1f})"
+    hovertemplate = (
+        "Planet %{customdata[0]} (%{customdata[1]})<br>"
+        f"Position: {position}<br>"
+        "Resources: %{customdata[2]:.2f}M<br>"
+        "Owner: %{customdata[3]}<extra></extra>"
+    )
+    if three_d:
+        fig = go.Figure(go.Scatter3d(
+            x=points['x'], y=points['y'], z=points['z'],
+            mode='markers', marker=marker,
+            customdata=customdata, hovertemplate=hovertemplate, name='Planets'
+        ))
+        fig.update_layout(
+            scene=dict(
+                xaxis=dict(
+                    title_text='X (ly)',
+                    tickfont=dict(size=10)
+                ),
+                yaxis=dict(
+                    title_text='Y (ly)',
+                    tickfont=dict(size=10)
+                ),
+                zaxis=dict(
+                    title_text='Z (ly)',
+                    tickfont=dict(size=10)
+                ),
+                aspectmode='manual',
+                aspectratio=dict(x=1, y=1, z=0.7)
+            ),
+            height=700,
+            margin=dict(l=0, r=0, b=0, t=30)
+        )
+    else:
+        fig = go.Figure(go.Scattergl(
+            x=points['x'], y=points['y'],
+            mode='markers', marker=marker,
+            customdata=customdata, hovertemplate=hovertemplate, name=''
+        ))
+        fig.update_layout(
+            xaxis_title='X (ly)',
+            yaxis_title='Y (ly)',
+            height=600,
+            margin=dict(l=0, r=0, b=0, t=30)
+        )
+    return fig
 
 if st.session_state['sim']:
     sim = st.session_state['sim']
     stats_history = st.session_state['stats_history']
+    stats_df = stats_history.to_frame()
+    years = (stats_df['step'] * 1000).astype(int)
     event_manager = st.session_state['event_manager']
     # Tabs for different visualizations
     tab1, tab2, tab3, tab4, tab5 = st.tabs([
@@ -238,96 +441,8 @@ if st.session_state['sim']:
         
         with plot_container:
             try:
-                # Prepare star data
-                star_positions = np.array([
-                    [star.position[0], star.position[1], star.position[2]]
-                    for star in sim.galaxy.stars
-                ])
-                
-                # Prepare civilization data
-                civ_data = []
-                for civ in sim.galaxy.civilizations:
-                    if civ.status == 'alive':
-                        pos = civ.home_planet.star.position
-                        civ_data.append({
-                            'x': pos[0],
-                            'y': pos[1],
-                            'z': pos[2],
-                            'civ_id': f"Civ {civ.id}",
-                            'status': civ.status,
-                            'population': f"{civ.population:,}",
-                            'tech_level': civ.tech_level
-                        })
-                
-                # Create 3D scatter plot for stars
-                fig = go.Figure()
-                
-                # Add stars
-                fig.add_trace(go.Scatter3d(
-                    x=star_positions[:, 0],
-                    y=star_positions[:, 1],
-                    z=star_positions[:, 2],
-                    mode='markers',
-                    marker=dict(
-                        size=2,
-                        color='yellow',
-                        opacity=0.5,
-                        sizemode='diameter'
-                    ),
-                    name='Stars',
-                    hoverinfo='none'
-                ))
-                
-                # Add civilizations if any exist
-                if civ_data:
-                    df_civs = pd.DataFrame(civ_data)
-                    fig.add_trace(go.Scatter3d(
-                        x=df_civs['x'],
-                        y=df_civs['y'],
-                        z=df_civs['z'],
-                        mode='markers+text',
-                        marker=dict(
-                            size=8,
-                            color='red',
-                            symbol='diamond',
-                            line=dict(width=1, color='white')
-                        ),
-                        text=df_civs['civ_id'],
-                        textposition='top center',
-                        hoverinfo='text',
-                        hovertext=[
-                            f"<b>{row['civ_id']}</b><br>"
-                            f"Status: {row['status'].title()}<br>"
-                            f"Population: {row['population']}<br>"
-                            f"Tech Level: {row['tech_level']:.1f}"
-                            for _, row in df_civs.iterrows()
-                        ],
-                        name='Civilizations'
-                    ))
-                
-                # Update layout for better visualization
-                fig.update_layout(
-                    scene=dict(
-                        xaxis_title='X (light years)',
-                        yaxis_title='Y (light years)',
-                        zaxis_title='Z (light years)',
-                        aspectmode='auto',
-                        camera=dict(
-                            eye=dict(x=1.5, y=1.5, z=1.5)
-                        ),
-                        xaxis=dict(showbackground=False),
-                        yaxis=dict(showbackground=False),
-                        zaxis=dict(showbackground=False)
-                    ),
-                    margin=dict(l=0, r=0, b=0, t=30),
-                    height=700,
-                    legend=dict(
-                        yanchor='top',
-                        y=0.99,
-                        xanchor='left',
-                        x=0.01
-                    )
-                )
+                fig = get_run_cache().derived(st.session_state.get('run_key'), 'galaxy_map',
+                                              lambda: build_galaxy_map(sim))
                 
                 # Display the plot
                 st.plotly_chart(fig, use_container_width=True)
@@ -339,9 +454,9 @@ if st.session_state['sim']:
                 # Fallback to 2D visualization if 3D fails
                 fig, ax = plt.subplots(figsize=(10, 8))
                 ax.scatter(
-                    [s.position[0] for s in sim.galaxy.stars],
-                    [s.position[1] for s in sim.galaxy.stars],
-                    c='yellow', alpha=0.3, s=1
+                    sim.galaxy.star_positions[:, 0],
+                    sim.galaxy.star_positions[:, 1],
+                    c='yellow', alpha=0.3, s=1, rasterized=True
                 )
                 
                 # Plot civilizations
@@ -372,10 +487,9 @@ if st.session_state['sim']:
         with col2:
             st.metric("Total Planets", f"{len(sim.galaxy.planets):,}")
         with col3:
-            habitable_planets = sum(1 for p in sim.galaxy.planets if getattr(p, 'habitable', False))
-            st.metric("Habitable Planets", f"{habitable_planets:,}")
+            st.metric("Habitable Planets", f"{np.count_nonzero(sim.galaxy.planet_habitable):,}")
         with col4:
-            st.metric("Civilizations", f"{sum(1 for c in sim.galaxy.civilizations if c.status == 'alive')}")
+            st.metric("Civilizations", f"{sim.galaxy.civ_table.alive_count}")
     
     with tab2:
         st.subheader("📊 Civilization Statistics")
@@ -399,8 +513,8 @@ if st.session_state['sim']:
             # Add population trace (primary y-axis)
             fig.add_trace(
                 go.Scatter(
-                    x=[s['step'] * 1000 for s in stats_history],
-                    y=[s['total_population'] for s in stats_history],
+                    x=years,
+                    y=stats_df['total_population'],
                     name="Total Population",
                     line=dict(color='#1f77b4', width=2.5),
                     yaxis='y1'
@@ -410,8 +524,8 @@ if st.session_state['sim']:
             # Add tech level trace (secondary y-axis)
             fig.add_trace(
                 go.Scatter(
-                    x=[s['step'] * 1000 for s in stats_history],
-                    y=[s['avg_tech'] for s in stats_history],
+                    x=years,
+                    y=stats_df['avg_tech'],
                     name="Average Tech Level",
                     line=dict(color='#ff7f0e', width=2.5, dash='dash'),
                     yaxis='y2'
@@ -449,12 +563,13 @@ if st.session_state['sim']:
             st.plotly_chart(fig, use_container_width=True)
             
             # Add statistics
+            peak_population = int(stats_df['total_population'].max())
             col1, col2, col3 = st.columns(3)
             with col1:
                 st.metric(
                     "Peak Population", 
-                    f"{max(s['total_population'] for s in stats_history):,}",
-                    f"{max(s['total_population'] for s in stats_history) - stats_history[0]['total_population']:+,}"
+                    f"{peak_population:,}",
+                    f"{peak_population - stats_history[0]['total_population']:+,}"
                 )
             with col2:
                 st.metric(
@@ -474,8 +589,8 @@ if st.session_state['sim']:
             st.markdown("### Civilization Count Over Time")
             
             # Prepare data
-            steps = [s['step'] * 1000 for s in stats_history]
-            alive_civs = [s['alive_civs'] for s in stats_history]
+            steps = years.tolist()
+            alive_civs = stats_df['alive_civs'].astype(int).tolist()
             
             # Create area chart
             fig = go.Figure()
@@ -491,8 +606,7 @@ if st.session_state['sim']:
             ))
             
             # Add annotations for major changes
-            changes = [i for i in range(1, len(stats_history)) 
-                     if stats_history[i]['alive_civs'] != stats_history[i-1]['alive_civs']]
+            changes = np.flatnonzero(np.diff(stats_df['alive_civs'].to_numpy())) + 1
             
             for i in changes:
                 fig.add_annotation(
@@ -520,7 +634,7 @@ if st.session_state['sim']:
             # Add statistics
             initial_civs = stats_history[0]['alive_civs']
             final_civs = stats_history[-1]['alive_civs']
-            max_civs = max(s['alive_civs'] for s in stats_history)
+            max_civs = int(stats_df['alive_civs'].max())
             
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -534,8 +648,8 @@ if st.session_state['sim']:
             st.markdown("### Advanced Metrics")
             
             # Calculate additional metrics
-            war_count = [s.get('war_count', 0) for s in stats_history]
-            trade_volume = [s.get('trade_volume', 0) for s in stats_history]
+            war_count = stats_df['war_count'].astype(int).tolist()
+            trade_volume = stats_df['trade_volume'].tolist()
             
             # Create subplots
             fig = make_subplots(
@@ -601,6 +715,29 @@ if st.session_state['sim']:
             with col3:
                 st.metric("Peak Trade Volume", f"{peak_trade:,.0f}" if trade_volume else "N/A")
             
+            # Per-phase step timing
+            if getattr(sim, 'timer', None) is not None and sim.timer.size:
+                st.markdown("#### Step Timing")
+                timing_df = sim.timer.to_frame() * 1000
+                fig = go.Figure()
+                for phase in timing_df.columns:
+                    fig.add_trace(go.Scatter(
+                        x=timing_df.index,
+                        y=timing_df[phase],
+                        name=phase,
+                        mode='lines',
+                        stackgroup='phases'
+                    ))
+                fig.update_layout(
+                    title=f"Wall Time per Phase ({len(sim.galaxy.stars):,} stars, {len(sim.galaxy.civilizations)} civilizations)",
+                    xaxis_title="Step",
+                    yaxis_title="Milliseconds",
+                    height=400,
+                    margin=dict(l=50, r=50, t=80, b=50)
+                )
+                st.plotly_chart(fig, use_container_width=True)
+                st.dataframe(sim.timer.summary().round(4), use_container_width=True)
+            
             # Add network visualization if available
             if hasattr(sim, 'diplomacy') and hasattr(sim.diplomacy, 'relationships'):
                 st.markdown("---")
@@ -731,17 +868,6 @@ if st.session_state['sim']:
             fig_minerals = plt.figure(figsize=(10, 8))
             plot_resource_heatmap(sim.galaxy)
             st.pyplot(fig_minerals)
-            
-            # Add statistics
-            mineral_values = [p.minerals for p in sim.galaxy.planets if hasattr(p, 'minerals')]
-            if mineral_values:
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Average Minerals", f"{np.mean(mineral_values):.1f}")
-                with col2:
-                    st.metric("Max Minerals", f"{max(mineral_values):.1f}")
-                with col3:
-                    st.metric("Total Minerals", f"{sum(mineral_values):,.0f}")
         
         with resource_tabs[1]:
             st.markdown("### Energy Resources")
@@ -749,17 +875,6 @@ if st.session_state['sim']:
             fig_energy = plt.figure(figsize=(10, 8))
             plot_resource_heatmap(sim.galaxy)
             st.pyplot(fig_energy)
-            
-            # Add statistics
-            energy_values = [p.energy for p in sim.galaxy.planets if hasattr(p, 'energy')]
-            if energy_values:
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Average Energy", f"{np.mean(energy_values):.1f}")
-                with col2:
-                    st.metric("Max Energy", f"{max(energy_values):.1f}")
-                with col3:
-                    st.metric("Total Energy", f"{sum(energy_values):,.0f}")
         
         with resource_tabs[2]:
             st.markdown("### Research Points")
@@ -767,75 +882,25 @@ if st.session_state['sim']:
             fig_research = plt.figure(figsize=(10, 8))
             plot_resource_heatmap(sim.galaxy)
             st.pyplot(fig_research)
-            
-            # Add statistics
-            research_values = [p.research for p in sim.galaxy.planets if hasattr(p, 'research')]
-            if research_values:
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Average Research", f"{np.mean(research_values):.1f}")
-                with col2:
-                    st.metric("Max Research", f"{max(research_values):.1f}")
-                with col3:
-                    st.metric("Total Research", f"{sum(research_values):,.0f}")
+        
+        # Planet resources are a single column, summarized without touching planet views
+        resources = np.asarray(sim.galaxy.planet_resources)
+        if len(resources):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Average Resources", f"{resources.mean():,.0f}")
+            with col2:
+                st.metric("Max Resources", f"{resources.max():,.0f}")
+            with col3:
+                st.metric("Total Resources", f"{resources.sum():,.0f}")
         
         # Add interactive 3D visualization if possible
         st.markdown("---")
         st.markdown("### 3D Resource Distribution")
         
         try:
-            # Create 3D scatter plot of planets with resource values
-            fig_3d = go.Figure()
-            
-            # Add planets as 3D scatter points
-            for planet in sim.galaxy.planets:
-                if hasattr(planet, 'minerals') and hasattr(planet, 'energy') and hasattr(planet, 'research'):
-                    # Calculate total resource value for size
-                    total_resources = planet.minerals + planet.energy + planet.research
-                    
-                    # Add the planet to the 3D plot
-                    fig_3d.add_trace(go.Scatter3d(
-                        x=[planet.star.position[0]],
-                        y=[planet.star.position[1]],
-                        z=[planet.star.position[2]],
-                        mode='markers',
-                        marker=dict(
-                            size=5 + (total_resources / 10),  # Scale size by resources
-                            color=planet.minerals,  # Color by mineral content
-                            colorscale='Viridis',
-                            opacity=0.8,
-                            colorbar=dict(title='Mineral Content'),
-                            showscale=True
-                        ),
-                        text=f"Planet at ({planet.star.position[0]:.1f}, {planet.star.position[1]:.1f}, {planet.star.position[2]:.1f})<br>"
-                             f"Minerals: {planet.minerals:.1f}<br>"
-                             f"Energy: {planet.energy:.1f}<br>"
-                             f"Research: {planet.research:.1f}",
-                        hoverinfo='text'
-                    ))
-            
-            # Update layout for 3D plot
-            fig_3d.update_layout(
-                scene=dict(
-                    xaxis=dict(
-                        title_text='X (ly)',
-                        tickfont=dict(size=10)
-                    ),
-                    yaxis=dict(
-                        title_text='Y (ly)',
-                        tickfont=dict(size=10)
-                    ),
-                    zaxis=dict(
-                        title_text='Z (ly)',
-                        tickfont=dict(size=10)
-                    ),
-                    aspectmode='manual',
-                    aspectratio=dict(x=1, y=1, z=0.7)
-                ),
-                height=700,
-                margin=dict(l=0, r=0, b=0, t=30)
-            )
-            
+            fig_3d = get_run_cache().derived(st.session_state.get('run_key'), 'resource_map_3d',
+                                             lambda: build_resource_map(sim, three_d=True))
             st.plotly_chart(fig_3d, use_container_width=True)
             
         except Exception as e:
@@ -843,63 +908,71 @@ if st.session_state['sim']:
             st.info("Falling back to 2D visualization...")
             
             # Fallback to 2D scatter plot
-            fig_2d = go.Figure()
-            
-            # Add planets as 2D scatter points
-            for planet in sim.galaxy.planets:
-                if hasattr(planet, 'minerals') and hasattr(planet, 'energy') and hasattr(planet, 'research'):
-                    total_resources = planet.minerals + planet.energy + planet.research
-                    
-                    fig_2d.add_trace(go.Scatter(
-                        x=[planet.star.position[0]],
-                        y=[planet.star.position[1]],
-                        mode='markers',
-                        marker=dict(
-                            size=5 + (total_resources / 10),
-                            color=planet.minerals,
-                            colorscale='Viridis',
-                            opacity=0.8,
-                            showscale=True,
-                            colorbar=dict(title='Mineral Content')
-                        ),
-                        text=f"Planet at ({planet.star.position[0]:.1f}, {planet.star.position[1]:.1f})<br>"
-                             f"Minerals: {planet.minerals:.1f}<br>"
-                             f"Energy: {planet.energy:.1f}<br>"
-                             f"Research: {planet.research:.1f}",
-                        hoverinfo='text',
-                        name=''
-                    ))
-            
-            fig_2d.update_layout(
-                xaxis_title='X (ly)',
-                yaxis_title='Y (ly)',
-                height=600,
-                margin=dict(l=0, r=0, b=0, t=30)
-            )
-            
+            fig_2d = build_resource_map(sim, three_d=False)
             st.plotly_chart(fig_2d, use_container_width=True)
     with tab4:
         st.subheader("Civilization Details")
-        for civ in sim.galaxy.civilizations:
-            st.markdown(f"### Civilization {civ.id} - Status: {civ.status}")
-            st.write(f"Population: {civ.population:,}")
-            st.write(f"Planets: {len(civ.planets)}")
-            st.write(f"Tech Level: {civ.tech_level}")
-            st.write(f"Traits: {civ.traits}")
-            st.write(f"Government: {getattr(civ, 'government', 'N/A')}")
-            st.write(f"Language: {getattr(civ, 'language', 'N/A')}")
-            st.write(f"Religion: {getattr(civ, 'religion', 'N/A')}")
-            st.write(f"Economy: {getattr(civ, 'economy', 'N/A')}")
-            st.write(f"History: {civ.history}")
-            if st.button(f"Show History Plot for Civ {civ.id}"):
-                plot_civilization_history(civ)
-                st.pyplot(plt.gcf())
-            if st.button(f"Show Tech Tree for Civ {civ.id}"):
-                plot_tech_tree(civ)
-                st.pyplot(plt.gcf())
+        civs = get_run_cache().derived(st.session_state.get('run_key'), 'civ_frame',
+                                       lambda: civilization_frame(sim.galaxy))
+        if civs.empty:
+            st.write("No civilizations in this simulation.")
+        else:
+            # Filter, sort and paginate here so only one page reaches the browser
+            filter_cols = st.columns(3)
+            with filter_cols[0]:
+                statuses = st.multiselect("Status", sorted(civs['status'].unique()), key='civ_status')
+            with filter_cols[1]:
+                governments = st.multiselect("Government", sorted(civs['government'].unique()),
+                                             key='civ_government')
+            with filter_cols[2]:
+                min_population = st.number_input("Minimum population", min_value=0, value=0, step=1000000,
+                                                  key='civ_min_population')
+            sort_cols = st.columns(3)
+            with sort_cols[0]:
+                sort_by = st.selectbox("Sort by", list(civs.columns), index=list(civs.columns).index('population'),
+                                       key='civ_sort_by')
+            with sort_cols[1]:
+                descending = st.toggle("Descending", value=True, key='civ_descending')
+            with sort_cols[2]:
+                page_size = st.selectbox("Rows per page", [25, 50, 100], key='civ_page_size')
+
+            mask = civs['population'] >= min_population
+            if statuses:
+                mask &= civs['status'].isin(statuses)
+            if governments:
+                mask &= civs['government'].isin(governments)
+            filtered = civs[mask].sort_values(sort_by, ascending=not descending, kind='stable')
+
+            pages = max(1, -(-len(filtered) // page_size))
+            if st.session_state.get('civ_page', 1) > pages:
+                st.session_state['civ_page'] = pages
+            page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1,
+                                   key='civ_page')
+            st.caption(f"{len(filtered):,} of {len(civs):,} civilizations match")
+            page_rows = filtered.iloc[(page - 1) * page_size:page * page_size]
+            st.dataframe(page_rows, use_container_width=True, hide_index=True)
+
+            if not page_rows.empty:
+                # Detail is loaded for the selected civilization only
+                civ_id = st.selectbox("Civilization", page_rows['id'].tolist(), key='civ_selected')
+                civ = sim.galaxy.civ_by_id[int(civ_id)]
+                st.markdown(f"### Civilization {civ.id} - Status: {civ.status}")
+                st.write(f"Traits: {civ.traits}")
+                history = list(civ.history)
+                if history:
+                    st.dataframe(pd.DataFrame({'event': history}), use_container_width=True, hide_index=True)
+                else:
+                    st.write("No history recorded.")
+                if st.button(f"Show History Plot for Civ {civ.id}"):
+                    plot_civilization_history(civ)
+                    st.pyplot(plt.gcf())
+                if st.button(f"Show Tech Tree for Civ {civ.id}"):
+                    plot_tech_tree(civ)
+                    st.pyplot(plt.gcf())
     with tab5:
         st.subheader("Event Log")
-        if event_manager and hasattr(event_manager, 'log'):
-            st.text(format_event_log(event_manager.log))
+        if event_manager and len(event_manager.log):
+            st.caption(f"{len(event_manager.log):,} events recorded")
+            st.dataframe(event_manager.log.to_frame(), use_container_width=True, hide_index=True)
         else:
             st.write("No events logged yet.") 
\ No newline at end of file
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True, scope='session')
+def galaxy_cache_dir(tmp_path_factory):
+    """Keep generated galaxies out of the user's cache directory."""
+    previous = os.environ.get('GALAXY_CACHE_DIR')
+    os.environ['GALAXY_CACHE_DIR'] = str(tmp_path_factory.mktemp('galaxies'))
+    yield os.environ['GALAXY_CACHE_DIR']
+    if previous is None:
+        del os.environ['GALAXY_CACHE_DIR']
+    else:
+        os.environ['GALAXY_CACHE_DIR'] = previous
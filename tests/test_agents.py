@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from agents import Civilization, CivilizationTable, HistoryJournal
+from galaxy import Galaxy
+
+
+def test_append_defaults_to_neutral_traits():
+    table = CivilizationTable(capacity=1)
+    for i in range(5):  # grows past the initial capacity
+        table.append(i, 1000, 0.01, 50)
+    np.testing.assert_array_equal(table.traits[:table.size], 0.5)
+    np.testing.assert_array_equal(table.ids[:table.size], np.arange(5))
+
+
+def test_running_totals_follow_updates():
+    table = CivilizationTable()
+    for i in range(4):
+        table.append(i, 1000 * (i + 1), 0.5, 10**9, tech_level=i + 1)
+    table.set_status(1, 1)
+    table.set_population(2, 7)
+    table.set_tech_level(3, 10)
+    table.grow(table.alive_rows())
+    alive = table.alive_rows()
+    assert table.alive_count == len(alive) == 3
+    assert table.alive_population == table.population[alive].sum()
+    assert table.alive_tech == table.tech_level[alive].sum()
+
+
+def test_grow_reports_depleted_rows():
+    table = CivilizationTable()
+    table.append(0, 10**6, 0.0, 10**9)
+    table.append(1, 10**6, 0.0, 10)
+    np.testing.assert_array_equal(table.grow(table.alive_rows()), [1])
+
+
+@pytest.fixture
+def civ():
+    galaxy = Galaxy(200, 1)
+    return Civilization(0, galaxy.planets[0], {'aggression': 0.2})
+
+
+def test_traits_mapping(civ):
+    assert dict(civ.traits) == {'aggression': 0.2, 'curiosity': 0.5, 'risk_tolerance': 0.5}
+    assert 'bravery' not in civ.traits
+    assert civ.traits.get('bravery', 0.7) == 0.7
+    with pytest.raises(KeyError):
+        civ.traits['bravery'] = 1.0
+    civ.cultural_change('bravery', 0.1)  # unknown traits are ignored
+    civ.cultural_change('aggression', 0.1)
+    assert civ.traits['aggression'] == pytest.approx(0.3)
+
+
+def test_journal_keeps_the_newest_entries_within_retention():
+    journal = HistoryJournal(retention=3)
+    journal.set_retention(1, None)
+    for i in range(5):
+        journal.record(0, 'colonized', i)
+        journal.record(1, 'researched', 'AI' if i % 2 else 'Fusion Power')
+    assert list(journal.view(0)) == ['Colonized planet 2', 'Colonized planet 3', 'Colonized planet 4']
+    assert len(journal.view(1)) == 5
+    assert journal.strings == ['Fusion Power', 'AI']  # interned once
+    journal.set_retention(1, 2)
+    assert list(journal.view(1)) == ['Researched AI', 'Researched Fusion Power']
+    assert journal.live == 5
+
+
+def test_journal_compaction_preserves_retained_history():
+    journal = HistoryJournal(retention=4)
+    for i in range(3000):
+        journal.record(i % 3, 'colonized', i)
+    assert journal.size < 3000  # dropped entries were reclaimed
+    for civ_id in range(3):
+        expected = [f'Colonized planet {i}' for i in range(3000) if i % 3 == civ_id][-4:]
+        assert list(journal.view(civ_id)) == expected
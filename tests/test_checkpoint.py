@@ -0,0 +1,75 @@
+import random
+
+import numpy as np
+import pytest
+
+from ai import QLearningPolicy
+from galaxy import Galaxy
+from simulation import Simulation
+
+# Enough stars for the seeds below to place civilizations
+N_STARS = 200000
+
+
+def make_simulation(vectorized):
+    policy = QLearningPolicy() if vectorized else None
+    sim = Simulation(N_STARS, 20, 1, vectorized=vectorized, policy=policy, events=True)
+    sim.run(5)
+    assert sim.galaxy.civ_table.alive_count > 0
+    return sim
+
+
+def snapshot(sim):
+    history = sim.stats_history
+    columns = {name: np.array(getattr(sim.galaxy, name)) for name in Galaxy.MUTABLE_COLUMNS}
+    table = sim.galaxy.civ_table
+    return history.data[:len(history)].copy(), columns, table.population[:table.size].copy()
+
+
+def assert_same(a, b):
+    np.testing.assert_array_equal(a[0], b[0])
+    for name in a[1]:
+        np.testing.assert_array_equal(a[1][name], b[1][name])
+    np.testing.assert_array_equal(a[2], b[2])
+
+
+@pytest.mark.parametrize('vectorized', [False, True])
+def test_restore_continues_bit_exact(vectorized):
+    sim = make_simulation(vectorized)
+    checkpoint = sim.checkpoint()
+    sim.run(15)
+    expected = snapshot(sim)
+
+    restored = Simulation.restore(checkpoint)
+    assert restored.current_step == 5
+    restored.run(15)
+    assert_same(snapshot(restored), expected)
+
+
+def test_restore_from_disk_continues_bit_exact(tmp_path):
+    sim = make_simulation(vectorized=True)
+    sim.checkpoint(tmp_path / 'checkpoint')
+    sim.run(15)
+    expected = snapshot(sim)
+
+    restored = Simulation.restore(str(tmp_path / 'checkpoint'))
+    restored.run(15)
+    assert_same(snapshot(restored), expected)
+
+
+@pytest.mark.parametrize('vectorized', [False, True])
+def test_fork_is_independent_and_bit_exact(vectorized):
+    sim = make_simulation(vectorized)
+    before = snapshot(sim)
+    rng_states = random.getstate(), np.random.get_state()
+    fork = sim.fork()
+    fork.run(15)
+    forked = snapshot(fork)
+    # Running the fork leaves the original untouched
+    assert_same(snapshot(sim), before)
+
+    # From the same RNG states the original continues exactly like the fork
+    random.setstate(rng_states[0])
+    np.random.set_state(rng_states[1])
+    sim.run(15)
+    assert_same(snapshot(sim), forked)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from events import EVENT_CODES, ConsoleSink, EventManager
+from galaxy import Galaxy
+from simulation import Simulation
+
+
+def event_counts(manager):
+    types = manager.log.records()['type']
+    return {name: int(np.count_nonzero(types == EVENT_CODES[name])) for name in EVENT_CODES}
+
+
+def assert_rate(count, trials, p):
+    # Five standard deviations of a binomial count
+    assert abs(count - trials * p) <= 5 * np.sqrt(trials * p * (1 - p)), (count, trials * p)
+
+
+@pytest.mark.parametrize('scheduled', [False, True])
+def test_cosmic_event_rates(scheduled):
+    steps = 20000
+    manager = EventManager(Galaxy(500, seed=3), scheduled=scheduled)
+    for _ in range(steps):
+        manager.maybe_trigger_cosmic_event()
+    counts = event_counts(manager)
+    for name, p in EventManager.COSMIC_EVENTS:
+        assert_rate(counts[name], steps, p)
+
+
+@pytest.mark.parametrize('scheduled', [False, True])
+def test_civilization_event_rates(scheduled):
+    steps = 2000
+    galaxy = Simulation(200000, 20, 1).galaxy
+    alive = galaxy.civ_table.alive_count
+    assert alive > 0
+    manager = EventManager(galaxy, scheduled=scheduled)
+    # Events that never collapse a civilization, so every step has the same number of trials
+    manager.CIVILIZATION_EVENTS = [('golden_age', 0.05), ('resource_boom', 0.02)]
+    for _ in range(steps):
+        manager.maybe_trigger_civilization_event()
+    counts = event_counts(manager)
+    for name, p in manager.CIVILIZATION_EVENTS:
+        assert_rate(counts[name], steps * alive, p)
+
+
+def test_console_sink_reports_suppressed_events_on_close(capsys):
+    sink = ConsoleSink(min_interval=3600)
+    manager = EventManager(Galaxy(50, seed=1), sinks=[sink])
+    for _ in range(3):
+        manager.emit('supernova', 0, star=1)
+        manager.flush()
+    manager.close()
+    lines = capsys.readouterr().out.splitlines()
+    assert lines == ['Supernova at star 1! All planets sterilized.', '(+2 more events)']
@@ -0,0 +1,20 @@
+from evolution import evolve
+
+SIM_KWARGS = dict(n_stars=200000, n_civs=20, steps=10, seeds=(1,))
+
+
+def test_serial_and_parallel_evolve_agree():
+    serial = evolve(population_size=4, generations=2, seed=3, workers=1, **SIM_KWARGS)
+    parallel = evolve(population_size=4, generations=2, seed=3, workers=2, **SIM_KWARGS)
+    assert parallel == serial
+    assert len({fitness for fitness, _ in serial}) > 1
+
+
+def test_resume_matches_uninterrupted_run(tmp_path):
+    full = evolve(population_size=4, generations=3, seed=3, workers=1,
+                  checkpoint_dir=str(tmp_path / 'full'), **SIM_KWARGS)
+    evolve(population_size=4, generations=2, seed=3, workers=1,
+           checkpoint_dir=str(tmp_path / 'resumed'), **SIM_KWARGS)
+    resumed = evolve(population_size=4, generations=3, seed=3, workers=1,
+                     checkpoint_dir=str(tmp_path / 'resumed'), resume=True, **SIM_KWARGS)
+    assert resumed == full
@@ -0,0 +1,52 @@
+import json
+import os
+import random
+import time
+
+import numpy as np
+
+from galaxy import Galaxy
+
+
+def entries(cache_dir):
+    return sorted(json.load(open(os.path.join(cache_dir, name, 'meta.json')))['seed']
+                  for name in os.listdir(cache_dir) if not name.startswith('.'))
+
+
+def test_hit_matches_fresh_generation(tmp_path):
+    fresh = Galaxy(2000, 5)
+    fresh_rng = random.random(), np.random.random()
+    Galaxy.cached(2000, 5, cache_dir=str(tmp_path))
+    hit = Galaxy.cached(2000, 5, cache_dir=str(tmp_path))
+    # A hit leaves the RNGs exactly where generation would
+    assert (random.random(), np.random.random()) == fresh_rng
+    for name in Galaxy.COLUMNS:
+        np.testing.assert_array_equal(getattr(hit, name), getattr(fresh, name))
+    for name in Galaxy.MUTABLE_COLUMNS:
+        column = getattr(hit, name)
+        assert type(column) is np.ndarray and column.flags.writeable
+
+
+def test_numpy_seed_shares_the_int_entry(tmp_path):
+    Galaxy.cached(2000, np.int64(5), cache_dir=str(tmp_path))
+    Galaxy.cached(2000, 5, cache_dir=str(tmp_path))
+    assert entries(str(tmp_path)) == [5]
+
+
+def test_unseeded_galaxies_bypass_the_cache(tmp_path):
+    a = Galaxy.cached(2000, None, cache_dir=str(tmp_path))
+    b = Galaxy.cached(2000, None, cache_dir=str(tmp_path))
+    assert not os.path.exists(tmp_path) or os.listdir(tmp_path) == []
+    assert not np.array_equal(a.star_positions, b.star_positions)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache_dir = str(tmp_path)
+    Galaxy.cached(2000, 1, cache_dir=cache_dir)
+    size = sum(entry.stat().st_size for name in os.listdir(cache_dir)
+               for entry in os.scandir(os.path.join(cache_dir, name)))
+    budget = int(2.5 * size)  # room for two entries
+    for seed in (2, 1, 3):  # the hit on 1 makes 2 the oldest
+        time.sleep(0.05)  # distinct mtimes on filesystems with coarse timestamps
+        Galaxy.cached(2000, seed, cache_dir=cache_dir, budget=budget)
+    assert entries(cache_dir) == [1, 3]
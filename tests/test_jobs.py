@@ -0,0 +1,69 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+import pandas as pd
+
+from jobs import Job, RunCache
+
+
+class ManualJobs:
+    """Stands in for JobManager: jobs are finished by hand instead of by a worker."""
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, config, steps, interval=0.25):
+        job = Job(Future(), queue.Queue(), threading.Event(), steps)
+        job.future.set_running_or_notify_cancel()
+        self.submitted.append(job)
+        return job
+
+
+def finish(job, sim):
+    job.updates.put((job.steps, pd.DataFrame({'step': range(job.steps)})))
+    job.future.set_result(sim)
+
+
+def test_identical_requests_share_one_job():
+    cache = RunCache(ManualJobs())
+    a = cache.get('k', {}, 10)
+    b = cache.get('k', {}, 10)
+    assert a is b and a.sessions == 2
+    assert not a.detach() and not a.cancel_event.is_set()
+    assert a.detach() and a.cancel_event.is_set()
+
+
+def test_detached_job_still_running_is_resubmitted():
+    jobs = ManualJobs()
+    cache = RunCache(jobs)
+    old = cache.get('k', {}, 10)
+    old.detach()
+    assert old.status == 'running'  # the worker has not noticed the cancel yet
+    new = cache.get('k', {}, 10)
+    assert new is not old and len(jobs.submitted) == 2
+
+
+def test_stale_completion_does_not_replace_resubmitted_job():
+    cache = RunCache(ManualJobs())
+    old = cache.get('k', {}, 10)
+    old.detach()
+    new = cache.get('k', {}, 10)
+    finish(old, 'truncated')
+    assert cache.complete('k', old) == 'truncated'
+    assert cache.entries['k'] is new and 'k' not in cache.sizes
+    finish(new, 'full')
+    assert cache.complete('k', new) == 'full'
+    assert cache.get('k', {}, 10) == 'full'
+
+
+def test_concurrent_polls_keep_every_batch():
+    job = ManualJobs().submit({}, 2000)
+    for step in range(2000):
+        job.updates.put((step + 1, pd.DataFrame({'step': [step]})))
+    threads = [threading.Thread(target=job.poll) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    job.poll()
+    assert sorted(job.partial['step']) == list(range(2000))
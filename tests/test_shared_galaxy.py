@@ -0,0 +1,44 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from galaxy import Galaxy
+from simulation import Simulation
+
+N_STARS = 200000
+
+
+@pytest.fixture(scope='module')
+def template():
+    with Galaxy(N_STARS, 11).share() as template:
+        yield template
+
+
+def test_attached_columns_are_plain_arrays(template):
+    galaxy = Galaxy.attach(template)
+    for name in Galaxy.COLUMNS:
+        assert type(getattr(galaxy, name)) is np.ndarray
+    for name in Galaxy.MUTABLE_COLUMNS:
+        assert getattr(galaxy, name).flags.writeable
+    assert np.count_nonzero(galaxy.planet_owner == -1) == len(galaxy.planet_owner)
+
+
+def test_attached_changes_stay_private(template):
+    a, b = Galaxy.attach(template), Galaxy.attach(template)
+    a.planet_owner[:10] = 3
+    a.planet_has_life[a.planet_resources > 0] = False
+    assert np.all(b.planet_owner == -1)
+    assert np.array_equal(b.planet_has_life, template.arrays()['planet_has_life'])
+    assert not np.shares_memory(a.planet_owner, b.planet_owner)
+
+
+def test_template_pickles_without_the_columns(template):
+    assert len(pickle.dumps(template)) < 4096
+
+
+def test_run_on_attached_galaxy_matches_private_galaxy(template):
+    shared = Simulation(N_STARS, 20, 4, galaxy=Galaxy.attach(template)).run(10)
+    private = Simulation(N_STARS, 20, 4, galaxy=Galaxy(N_STARS, 11)).run(10)
+    assert shared.column('alive_civs')[0] > 0
+    np.testing.assert_array_equal(shared.data[:len(shared)], private.data[:len(private)])
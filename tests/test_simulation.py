@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+from scipy.spatial.distance import cdist
+
+from agents import HistoryJournal
+from simulation import CommunicationLag, Simulation, War
+
+
+class StubCiv:
+    def __init__(self, id, journal, strength=0):
+        self.id = id
+        self.status = 'alive'
+        self.population = strength
+        self.tech_level = 0
+        self.history = journal.view(id)
+
+    def collapse(self, reason):
+        self.status = 'collapsed'
+
+
+@pytest.fixture
+def civs():
+    journal = HistoryJournal()
+    return [StubCiv(i, journal, strength=i) for i in range(4)]
+
+
+def test_war_registry_tracks_declare_and_resolve(civs):
+    war = War()
+    war.declare(civs[0], civs[1], step=2)
+    war.declare(civs[2], civs[1], step=3)
+    assert war.is_active(civs[0], civs[1]) and not war.is_active(civs[1], civs[0])
+    assert sorted(war.wars_of(civs[1]), key=lambda pair: pair[0].id) == [(civs[0], civs[1]), (civs[2], civs[1])]
+    war.resolve(civs[0], civs[1], step=7)
+    assert civs[0].status == 'collapsed'  # the stronger side wins
+    assert not war.is_active(civs[0], civs[1])
+    assert war.war_count == 2
+    np.testing.assert_array_equal(war.durations(), [5])
+
+
+def test_wars_end_when_a_side_collapses(civs):
+    war = War()
+    war.declare(civs[0], civs[1], step=0)
+    war.declare(civs[2], civs[3], step=1)
+    civs[1].collapse('revolt')
+    # Living civs whose only opponent collapsed are no longer at war
+    np.testing.assert_array_equal(war.at_war(np.array([0, 2, 3])), [False, True, True])
+    war.end_collapsed(step=4)
+    assert war.active_wars == [(civs[2], civs[3])]
+    assert not war.by_civ[0] and not war.by_civ[1]
+    np.testing.assert_array_equal(war.durations(), [4])
+
+
+@pytest.mark.parametrize('vectorized', [False, True])
+def test_no_war_outlives_its_sides(vectorized):
+    sim = Simulation(200000, 40, 1, vectorized=vectorized, galaxy_cache=False)
+    sim.run(60)
+    assert sim.war.war_count > 0
+    assert all(civ1.status == 'alive' and civ2.status == 'alive' for civ1, civ2 in sim.war.active_wars)
+    assert len(sim.war.durations()) + len(sim.war.active) == sim.war.war_count
+
+
+@pytest.fixture
+def galaxy():
+    galaxy = Simulation(200000, 20, 1).galaxy
+    assert galaxy.civ_table.size > 1
+    return galaxy
+
+
+def test_comm_lag_matrix_matches_distances(galaxy):
+    comms = CommunicationLag(galaxy, c=2)
+    comms.refresh()
+    table = galaxy.civ_table
+    positions = galaxy.star_positions[table.home_star[:table.size]]
+    ids = table.ids[:table.size]
+    np.testing.assert_allclose(comms.matrix[np.ix_(ids, ids)], cdist(positions, positions) / 2, rtol=1e-6)
+    a, b = galaxy.civilizations[:2]
+    assert comms.lag(a, b) == pytest.approx(np.linalg.norm(positions[0] - positions[1]) / 2, rel=1e-6)
+
+
+def test_comm_lag_rebuilds_only_when_homes_change(galaxy):
+    comms = CommunicationLag(galaxy)
+    comms.refresh()
+    matrix = comms.matrix
+    comms.refresh()
+    assert comms.matrix is matrix
+
+    civ = galaxy.civilizations[0]
+    other_star = (civ.home_planet.star.id + 1) % len(galaxy.star_types)
+    civ.home_planet = galaxy.planets[galaxy.star_planet_start[other_star]]
+    comms.refresh()
+    assert comms.matrix is not matrix
+    other = galaxy.civilizations[1]
+    expected = np.linalg.norm(galaxy.star_positions[other_star] - other.home_planet.star.position)
+    assert comms.matrix[civ.id, other.id] == pytest.approx(expected, rel=1e-6)
+
+    matrix = comms.matrix
+    table = galaxy.civ_table
+    new_id = int(table.ids[:table.size].max()) + 1
+    table.append(new_id, 1000, 0.01, 10, home_star=3)
+    comms.refresh()
+    assert comms.matrix is not matrix and comms.matrix.shape == (new_id + 1, new_id + 1)
@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+
+from simulation import Simulation
+from stats import NpyChunkSink
+
+
+def test_npy_chunks_read_back_lazily(tmp_path):
+    path = str(tmp_path / 'stats')
+    sim = Simulation(2000, 3, 1)
+    for _ in sim.stream(25, batch_size=4, sinks=[NpyChunkSink(path, chunk_rows=10)]):
+        pass
+    expected = sim.stats_history.to_frame().astype(float)
+
+    chunks = list(NpyChunkSink.chunks(path))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert all(isinstance(chunk, np.memmap) for chunk in chunks)
+    pd.testing.assert_frame_equal(NpyChunkSink.load(path), expected)
+    pd.testing.assert_frame_equal(NpyChunkSink.load(path, 8, 13),
+                                  expected.iloc[8:13].reset_index(drop=True))
+    assert len(NpyChunkSink.load(path, 30)) == 0
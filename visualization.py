@@ -33,7 +33,7 @@ def plot_civilization_stats(stats_history):
     """
     Plots the number of alive civilizations and total population over time.
     """
-    df = pd.DataFrame(stats_history)
+    df = stats_history.to_frame() if hasattr(stats_history, 'to_frame') else pd.DataFrame(stats_history)
     plt.figure()
     plt.plot(df['alive_civs'], label='Alive Civilizations')
     plt.plot(df['total_population'], label='Total Population')
@@ -93,17 +93,108 @@ def plot_civilization_history(civilization):
     plt.show()
 
 
+def planet_resource_points(galaxy):
+    """
+    One row per planet, built from the galaxy's planet columns: id,
+    position (its star's), resources, type and owner (-1 if none).
+    """
+    positions = galaxy.star_positions[galaxy.planet_star]
+    resources = np.asarray(galaxy.planet_resources)
+    owner = np.asarray(galaxy.planet_owner)
+    types = np.array(galaxy.PLANET_TYPES)[galaxy.planet_types]
+    return pd.DataFrame({
+        'planet': np.arange(len(resources)),
+        'x': positions[:, 0],
+        'y': positions[:, 1],
+        'z': positions[:, 2],
+        'resources': resources,
+        'planet_type': types,
+        'owner': owner,
+    })
+
+
+def civilization_frame(galaxy):
+    """
+    One row per civilization: numeric state and traits straight from the
+    civ_table columns, plus culture attributes, planet and history counts.
+    """
+    table = galaxy.civ_table
+    n = table.size
+    civs = sorted(galaxy.civilizations, key=lambda civ: civ.row)
+    frame = pd.DataFrame({
+        'id': table.ids[:n],
+        'status': np.array(table.STATUSES)[table.status[:n]],
+        'population': table.population[:n],
+        'planets': [len(civ.planets) for civ in civs],
+        'tech_level': table.tech_level[:n],
+        'resources': table.resources[:n],
+        'growth_rate': table.growth_rate[:n],
+    })
+    for i, trait in enumerate(table.TRAITS):
+        frame[trait] = table.traits[:n, i]
+    for attribute in ('government', 'language', 'religion', 'economy'):
+        frame[attribute] = [getattr(civ, attribute, 'N/A') for civ in civs]
+    frame['history_events'] = [galaxy.journal.counts.get(int(civ_id), 0) for civ_id in table.ids[:n]]
+    return frame
+
+
+def star_lod(positions, budget=20000):
+    """
+    Level-of-detail star points for maps: at most `budget` points whatever
+    the number of stars. Up to the budget every star is kept; above it stars
+    are aggregated into the voxels of a regular grid and each occupied voxel
+    becomes one point at its stars' centroid. The grid is the finest one,
+    found by doubling then bisecting the cells per axis, whose occupied
+    voxels still fit the budget, so clustered galaxies get finer grids.
+    Returns (points, counts), counts being the stars behind each point.
+    """
+    positions = np.asarray(positions)
+    n = len(positions)
+    if n <= budget:
+        return positions, np.ones(n, dtype=np.int64)
+    low = positions.min(axis=0)
+    unit = (positions - low) / np.maximum(positions.max(axis=0) - low, 1e-9)
+
+    def voxels(cells):
+        index = np.minimum(unit * cells, cells - 1).astype(np.int64)
+        return np.ravel_multi_index(index.T, (cells,) * 3)
+
+    def fits(cells):
+        return len(np.unique(voxels(cells))) <= budget
+
+    # cells**3 <= budget always fits; grow from there (2**20 cells keeps ids in int64)
+    cells = max(int(budget ** (1 / 3)), 1)
+    high = 2 * cells
+    while high <= 2**20 and fits(high):
+        cells, high = high, 2 * high
+    while high - cells > 1:
+        middle = (cells + high) // 2
+        if fits(middle):
+            cells = middle
+        else:
+            high = middle
+    occupied, inverse, counts = np.unique(voxels(cells), return_inverse=True, return_counts=True)
+    points = np.column_stack([np.bincount(inverse, positions[:, axis], len(occupied))
+                              for axis in range(3)]) / counts[:, None]
+    return points, counts
+
+
+def owned_systems(galaxy):
+    """Star ids with at least one owned planet, and the owner of the first such planet."""
+    owner = np.asarray(galaxy.planet_owner)
+    owned = np.flatnonzero(owner != -1)
+    stars, first = np.unique(galaxy.planet_star[owned], return_index=True)
+    return stars, owner[owned[first]]
+
+
 def plot_resource_heatmap(galaxy):
     """
     Plots a heatmap of resource distribution across the galaxy.
     """
-    xs, ys, resources = [], [], []
-    for planet in galaxy.planets:
-        xs.append(planet.star.position[0])
-        ys.append(planet.star.position[1])
-        resources.append(planet.resources)
+    positions = galaxy.star_positions[galaxy.planet_star]
     plt.figure(figsize=(10, 8))
-    plt.hexbin(xs, ys, C=resources, gridsize=50, cmap='YlOrRd', bins='log')
+    plt.hexbin(positions[:, 0], positions[:, 1], C=np.asarray(galaxy.planet_resources),
+               gridsize=50, cmap='YlOrRd', bins='log')
     plt.colorbar(label='Resource Abundance (log scale)')
     plt.xlabel('X (ly)')
     plt.ylabel('Y (ly)')